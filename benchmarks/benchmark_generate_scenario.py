@@ -0,0 +1,49 @@
+import argparse
+import json
+import openmlaslib
+import openmlaslib.testing
+import shutil
+import tempfile
+
+
+def benchmark_grid(num_tasks, num_setups, density, n_jobs, output_dir):
+    """
+    Generates a scenario on a synthetic grid, and records the metrics of each phase
+
+    :return: dict
+        mapping from phase name to its metrics (wall time, api calls, peak memory, etc)
+    """
+    fake = openmlaslib.testing.FakeOpenML(num_tasks=num_tasks, num_setups=num_setups, density=density)
+    setupid_setupname = {setup_id: 'Setup_%d' % setup_id for setup_id in fake.setup_ids}
+    profiler = openmlaslib.utils.Profiler(trace_memory=True)
+    with fake.patch():
+        openmlaslib.utils.generate_scenario(setupid_setupname, fake.task_ids, 'predictive_accuracy', output_dir,
+                                            'Benchmark', n_jobs=n_jobs, profiler=profiler)
+    return profiler.to_dict()['phases']
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+                                     description='Benchmarks scenario generation on synthetic (offline) grids')
+    parser.add_argument('--grids', type=str, nargs='+', default=['100x100', '1000x500'],
+                        help='grid sizes, as number of tasks x number of setups (e.g., 5000x2000)')
+    parser.add_argument('--density', type=float, default=0.9, help='fraction of cells that has an evaluation')
+    parser.add_argument('--n_jobs', type=int, default=8, help='number of concurrent requests')
+    parser.add_argument('--output_file', type=str, default=None, help='if set, the report is stored here as json')
+    args_ = parser.parse_args()
+
+    results = dict()
+    output_dir = tempfile.mkdtemp()
+    try:
+        for grid in args_.grids:
+            num_tasks, num_setups = [int(size) for size in grid.split('x')]
+            results[grid] = benchmark_grid(num_tasks, num_setups, args_.density, args_.n_jobs, output_dir)
+            for phase, metrics in results[grid].items():
+                print('%-12s %-15s %10.3f s %8d calls %10.1f MB' % (grid, phase, metrics['wall_time'],
+                                                                     metrics['api_calls'], metrics['peak_memory_mb']))
+    finally:
+        shutil.rmtree(output_dir)
+
+    if args_.output_file is not None:
+        with open(args_.output_file, 'w') as fp:
+            json.dump(results, fp, indent=2)
@@ -12,12 +12,31 @@ if __name__ == '__main__':
     parser.add_argument('--name', type=str, default='Misc', help='name of the scenario')
     parser.add_argument('--require_complete', action='store_true',
                         help='if set to true, an error is thrown if not all tasks are ran on all setups')
+    parser.add_argument('--cache_dir', type=str, default=None, help='if set, OpenML metadata is cached here')
+    parser.add_argument('--offline', action='store_true', help='if set, only the cache is used (requires cache_dir)')
+    parser.add_argument('--cache_ttl', type=float, default=None,
+                        help='if set, cached metadata expires after this number of seconds')
+    parser.add_argument('--prune_incomplete', action='store_true',
+                        help='if set, tasks and setups are dropped until the remaining grid is (nearly) complete')
+    parser.add_argument('--min_coverage', type=float, default=1.0,
+                        help='fraction of the grid that should be observed after pruning')
+    parser.add_argument('--per_fold', action='store_true',
+                        help='if set, the results of all folds and repetitions are obtained (instead of their mean)')
     args_ = parser.parse_args()
 
+    cache = None
+    if args_.cache_dir is not None:
+        cache = openmlaslib.utils.MetadataCache(os.path.join(args_.cache_dir, 'metadata.sqlite'),
+                                                ttl=args_.cache_ttl, offline=args_.offline)
+
     setupid_setupname = {sid: 'setup_%d' % sid for sid in args_.setup_ids}
     openmlaslib.utils.generate_scenario(tasks=args_.task_ids,
                                         setupid_setupname=setupid_setupname,
                                         measure=args_.measure,
                                         output_dir=args_.output_dir,
                                         scenario_name=args_.name,
-                                        require_complete=args_.require_complete)
+                                        require_complete=args_.require_complete,
+                                        cache=cache,
+                                        prune_incomplete=args_.prune_incomplete,
+                                        min_coverage=args_.min_coverage,
+                                        per_fold=args_.per_fold)
@@ -1,7 +1,9 @@
 import argparse
+import logging
 import os
 import openml
 import openmlaslib
+import openmlaslib.utils.runner
 import sklearn.naive_bayes
 import sklearn.pipeline
 import sklearn.preprocessing
@@ -15,19 +17,20 @@ def cli_arguments():
     parser.add_argument('--output_dir', type=str, default=os.path.expanduser('~').replace('\\', '/') + '/openml-aslib/')
     parser.add_argument('--measure', type=str, default='predictive_accuracy', help='measure that is being optimized')
     parser.add_argument('--name', type=str, default='Misc', help='name of the scenario')
+    parser.add_argument('--n_jobs', type=int, default=1, help='number of processes that run the models')
+    parser.add_argument('--checkpoint_file', type=str, default=None,
+                        help='file that records the finished runs (default: in output_dir), to resume after a crash')
     return parser.parse_args()
 
 
-def run_flow_on_benchmark_suite(estimator, task_ids):
+def build_model(estimator):
     """
-    Runs a flow on all tasks in an OpenML benchmark suite (for later use in OpenML ASLib)
+    Wraps an estimator in a pipeline that can be ran on all tasks in an OpenML benchmark suite (for later use in
+    OpenML ASLib)
 
     :param estimator: a model compatible with the sklearn API
-    :param task_ids: a list of task ids
-    :return: setup_id: the OpenML setup id of this model / hyperparameter combination
+    :return: model: a pipeline with fixed random seed, that imputes missing values before applying the estimator
     """
-    setup_id = None
-
     # set the random seed (important, as otherwise OpenML connector will choose one)
     if 'random_state' in estimator.get_params():
         estimator.set_params(random_state=1)
@@ -36,42 +39,13 @@ def run_flow_on_benchmark_suite(estimator, task_ids):
         ('imputation', sklearn.preprocessing.Imputer(strategy='median')),
         ('estimator', estimator)
     ])
-
-    # iterate over all tasks
-    for task_id in task_ids:
-        # download all task specific information (will be cached for later use)
-        task = openml.tasks.get_task(task_id)
-        print('Running %s on task %d (%s)' % (str(estimator), task_id, task.get_dataset().name))
-        try:
-            # run the model on the task
-            run = openml.runs.run_model_on_task(task, model, avoid_duplicate_runs=True)
-            # publish the run on OpenML
-            run_id = run.publish().run_id
-        except openml.exceptions.PyOpenMLError as e:
-            # apparently someone already executed this run. No problem, we can re-use their results
-            assert e.message.startswith('Run already exists in server.')
-            run_ids = e.message.split('{')[1].split('}')[0].split(',')
-            run_id = int(run_ids[0])
-            print('- Already exists, using run id %d' % run_id)
-
-        # obtain the stored run object from the server. This is how we will acquire the setup id
-        # (which uniquely identifies this model / hyperparameter combination)
-        run = openml.runs.get_run(run_id)
-        if setup_id is None:
-            setup_id = run.setup_id
-        else:
-            # sanity check
-            if setup_id != run.setup_id:
-                # if the setup id doesn't match, this means at least one of the hyperparameters
-                # has changed across the tasks.
-                # most likely candidates are the random seed or an indicator for categorical features,
-                # if using a OneHotEncoder
-                raise ValueError('Setup ids do not match')
-    return setup_id
+    return model
 
 
 if __name__ == '__main__':
     args_ = cli_arguments()
+    # reports the progress of the runs
+    logging.basicConfig(level=logging.INFO)
 
     # download the benchmark suite (= a set of Machine Learning tasks) from OpenML
     benchmark_suite = openml.study.get_study(args_.benchmark_suite, 'tasks')
@@ -90,14 +64,15 @@ if __name__ == '__main__':
     # a setup represents an algorithm with hyperparameter settings (sometimes called a configuration)
     # for more information about the OpenML nomocloture, read this blogpost:
     # https://medium.com/open-machine-learning/basic-components-of-openml-a5745634c664
-    setupid_setupname = dict()
-    
-    # iterate over the machine learning algorithms
-    for name, estimator in estimators.items():
-        # the function `run_flow_on_benchmark_suite' will run the setup on all tasks
-        setup_id = run_flow_on_benchmark_suite(estimator, benchmark_suite.tasks)
-        # record the obtained setup id
-        setupid_setupname[setup_id] = name
+    models = {name: build_model(estimator) for name, estimator in estimators.items()}
+    checkpoint_file = args_.checkpoint_file
+    if checkpoint_file is None:
+        checkpoint_file = os.path.join(args_.output_dir, args_.name + '_runs.jsonl')
+
+    # run all models on all tasks (in parallel), and record the obtained setup ids. When this crashes, running
+    # the script again will only run the combinations that were not finished yet
+    setupid_setupname = openmlaslib.utils.runner.run_models_on_tasks(models, benchmark_suite.tasks,
+                                                                     checkpoint_file, n_jobs=args_.n_jobs)
 
     # that's it. Now just create the benchmark suite ..
     openmlaslib.utils.generate_scenario(tasks=benchmark_suite.tasks,
@@ -10,8 +10,21 @@ if __name__ == '__main__':
     parser.add_argument('--output_dir', type=str, default=os.path.expanduser('~').replace('\\', '/') + '/openml-aslib/')
     parser.add_argument('--measure', type=str, default='predictive_accuracy', help='measure that is being optimized')
     parser.add_argument('--require_complete', action='store_true', help='measure that is being optimized')
+    parser.add_argument('--cache_dir', type=str, default=None, help='if set, OpenML metadata is cached here')
+    parser.add_argument('--offline', action='store_true', help='if set, only the cache is used (requires cache_dir)')
+    parser.add_argument('--cache_ttl', type=float, default=None,
+                        help='if set, cached metadata expires after this number of seconds')
+    parser.add_argument('--prune_incomplete', action='store_true',
+                        help='if set, tasks and setups are dropped until the remaining grid is (nearly) complete')
+    parser.add_argument('--min_coverage', type=float, default=1.0,
+                        help='fraction of the grid that should be observed after pruning')
     args_ = parser.parse_args()
 
+    cache = None
+    if args_.cache_dir is not None:
+        cache = openmlaslib.utils.MetadataCache(os.path.join(args_.cache_dir, 'metadata.sqlite'),
+                                                ttl=args_.cache_ttl, offline=args_.offline)
+
     study = openml.study.get_study(args_.study_id)
     setupid_setupname = {sid: 'setup_%d' % sid for sid in study.setups}
     openmlaslib.utils.generate_scenario(tasks=study.tasks,
@@ -19,4 +32,7 @@ if __name__ == '__main__':
                                         measure=args_.measure,
                                         output_dir=args_.output_dir,
                                         scenario_name='Study_' + str(study.id),
-                                        require_complete=args_.require_complete)
+                                        require_complete=args_.require_complete,
+                                        cache=cache,
+                                        prune_incomplete=args_.prune_incomplete,
+                                        min_coverage=args_.min_coverage)
@@ -0,0 +1,326 @@
+import collections
+import contextlib
+import http.server
+import numpy as np
+import openml
+import threading
+import time
+
+from typing import Dict, List, Optional
+from unittest import mock
+
+
+FakeEvaluation = collections.namedtuple('FakeEvaluation', ['run_id', 'task_id', 'setup_id', 'flow_id', 'flow_name',
+                                                           'data_id', 'data_name', 'function', 'upload_time',
+                                                           'value', 'values'])
+FakeParameter = collections.namedtuple('FakeParameter', ['id', 'flow_id', 'flow_name', 'full_name', 'parameter_name',
+                                                         'data_type', 'default_value', 'value'])
+FakeSetup = collections.namedtuple('FakeSetup', ['setup_id', 'flow_id', 'parameters'])
+FakeFlow = collections.namedtuple('FakeFlow', ['flow_id', 'name', 'version'])
+FakeDataset = collections.namedtuple('FakeDataset', ['dataset_id', 'name', 'qualities'])
+
+# names of some common OpenML qualities, used (with a numeric suffix when more are requested) as quality names
+QUALITY_NAMES = ['NumberOfInstances', 'NumberOfFeatures', 'NumberOfClasses', 'NumberOfMissingValues',
+                 'NumberOfNumericFeatures', 'NumberOfSymbolicFeatures', 'MajorityClassPercentage',
+                 'MinorityClassPercentage', 'Dimensionality', 'ClassEntropy', 'MeanAttributeEntropy',
+                 'MeanMutualInformation', 'EquivalentNumberOfAtts', 'MeanKurtosisOfNumericAtts',
+                 'MeanSkewnessOfNumericAtts', 'MeanStdDevOfNumericAtts', 'DecisionStumpAUC', 'DecisionStumpErrRate',
+                 'NaiveBayesAUC', 'kNN1NErrRate']
+
+
+class FakeOpenML(object):
+    """
+    local stand-in for the parts of the OpenML API that are used to generate scenarios (listing evaluations, dataset
+    qualities, setups and flows). It serves a synthetic grid of tasks x setups, of configurable size and sparsity.
+    Use patch() to redirect the openml package to this grid.
+
+    :param num_tasks: int
+        the number of tasks in the grid (task ids start at first_task_id)
+    :param num_setups: int
+        the number of setups in the grid (setup ids start at first_setup_id)
+    :param density: float
+        the fraction of (task, setup) cells that has an evaluation
+    :param num_qualities: int
+        the number of qualities per dataset
+    :param quality_density: float
+        the fraction of qualities that is known for each dataset
+    :param num_datasets: int
+        the number of datasets. Tasks are spread over the datasets, so that several tasks can share a dataset.
+        None means one dataset per task
+    :param setups_per_flow: int
+        the number of consecutive setups that share the same flow
+    :param seed: int
+        random seed, the same arguments always give the same grid
+    :param first_task_id: int
+        the id of the first task
+    :param first_setup_id: int
+        the id of the first setup
+    :param num_repeats: int
+        the number of repetitions of each run (for evaluations listed per fold)
+    :param num_folds: int
+        the number of folds of each repetition (for evaluations listed per fold). The mean of the fold values of a
+        run equals its aggregated value
+    """
+
+    def __init__(self, num_tasks: int, num_setups: int, density: float=1.0, num_qualities: int=20,
+                 quality_density: float=1.0, num_datasets: Optional[int]=None, setups_per_flow: int=1,
+                 seed: int=0, first_task_id: int=1, first_setup_id: int=1, num_repeats: int=1, num_folds: int=10):
+        rng = np.random.RandomState(seed)
+        self.task_ids = list(range(first_task_id, first_task_id + num_tasks))
+        self.setup_ids = list(range(first_setup_id, first_setup_id + num_setups))
+        self._task_index = {task_id: idx for idx, task_id in enumerate(self.task_ids)}
+        self._setup_index = {setup_id: idx for idx, setup_id in enumerate(self.setup_ids)}
+
+        num_datasets = num_tasks if num_datasets is None else num_datasets
+        self.task_data_id = {task_id: 1 + idx % num_datasets for idx, task_id in enumerate(self.task_ids)}
+        self.setup_flow_id = {setup_id: 1 + idx // setups_per_flow for idx, setup_id in enumerate(self.setup_ids)}
+
+        self.observed = rng.rand(num_tasks, num_setups) < density
+        self.values = np.round(rng.rand(num_tasks, num_setups), 4)
+
+        self.quality_names = [QUALITY_NAMES[idx % len(QUALITY_NAMES)] +
+                              ('' if idx < len(QUALITY_NAMES) else str(idx // len(QUALITY_NAMES)))
+                              for idx in range(num_qualities)]
+        self.quality_observed = rng.rand(num_datasets, num_qualities) < quality_density
+        self.quality_values = np.round(rng.rand(num_datasets, num_qualities) * 1000, 2)
+        self.num_repeats = num_repeats
+        self.num_folds = num_folds
+
+        self.calls = collections.Counter()
+        self._lock = threading.Lock()
+
+    def _count(self, name: str):
+        with self._lock:
+            self.calls[name] += 1
+
+    def fold_values(self, row: int, column: int) -> np.ndarray:
+        """
+        :return: the fold values of a run, as array of repetitions x folds. These are centered around its value
+        """
+        noise = np.random.RandomState(row * len(self.setup_ids) + column).normal(0, 0.05, (self.num_repeats,
+                                                                                         self.num_folds))
+        return self.values[row, column] + noise - noise.mean()
+
+    def _evaluation(self, row: int, column: int, function: str, per_fold: bool=False) -> FakeEvaluation:
+        task_id, setup_id = self.task_ids[row], self.setup_ids[column]
+        return FakeEvaluation(run_id=row * len(self.setup_ids) + column + 1, task_id=task_id, setup_id=setup_id,
+                              flow_id=self.setup_flow_id[setup_id], flow_name='Flow_%d' % self.setup_flow_id[setup_id],
+                              data_id=self.task_data_id[task_id], data_name='Data_%d' % self.task_data_id[task_id],
+                              function=function, upload_time='2017-01-01 00:00:00',
+                              value=None if per_fold else float(self.values[row, column]),
+                              values=self.fold_values(row, column).tolist() if per_fold else None)
+
+    def qualities(self, data_id: int) -> Dict[str, float]:
+        """
+        :return: the qualities of a dataset that are known, as dict mapping from quality name to value
+        """
+        return {name: float(value) for name, value, known
+                in zip(self.quality_names, self.quality_values[data_id - 1], self.quality_observed[data_id - 1])
+                if known}
+
+    def list_evaluations(self, function: str, offset: Optional[int]=None, size: Optional[int]=None,
+                         tasks: Optional[List[int]]=None, setups: Optional[List[int]]=None,
+                         flows: Optional[List[int]]=None, runs: Optional[List[int]]=None,
+                         uploaders: Optional[List[int]]=None, tag: Optional[str]=None, study: Optional[int]=None,
+                         per_fold: Optional[bool]=None, sort_order: Optional[str]=None,
+                         output_format: str='object') -> Dict[int, FakeEvaluation]:
+        self._count('list_evaluations')
+        rows = np.array(sorted(self._task_index[task_id] for task_id in (self.task_ids if tasks is None else tasks)
+                               if task_id in self._task_index), dtype=np.int64)
+        columns = np.array(sorted(self._setup_index[setup_id] for setup_id in
+                                  (self.setup_ids if setups is None else setups) if setup_id in self._setup_index),
+                           dtype=np.int64)
+        # ordered by run id
+        cells = np.argwhere(self.observed[np.ix_(rows, columns)])
+        offset = 0 if offset is None else offset
+        cells = cells[offset:] if size is None else cells[offset:offset + size]
+        evaluations = [self._evaluation(rows[row], columns[column], function, per_fold) for row, column in cells]
+        return {evaluation.run_id: evaluation for evaluation in evaluations}
+
+    def perform_api_call(self, call: str, *args, **kwargs) -> str:
+        self._count('perform_api_call')
+        if not call.startswith('data/qualities/'):
+            raise NotImplementedError('Fake OpenML does not support call %s' % call)
+        data_id = int(call.split('/')[-1])
+        if len(self.qualities(data_id)) == 0:
+            # like OpenML, for datasets of which no qualities were computed
+            raise openml.exceptions.OpenMLServerException('No qualities found', code=362)
+        qualities = ''.join('<oml:quality><oml:name>%s</oml:name><oml:value>%s</oml:value></oml:quality>' %
+                            (name, repr(value)) for name, value in self.qualities(data_id).items())
+        return '<oml:data_qualities xmlns:oml="http://openml.org/openml">%s</oml:data_qualities>' % qualities
+
+    def get_dataset(self, data_id: int, *args, **kwargs) -> FakeDataset:
+        self._count('get_dataset')
+        return FakeDataset(dataset_id=data_id, name='Data_%d' % data_id, qualities=self.qualities(data_id))
+
+    def list_setups(self, flow: Optional[int]=None, tag: Optional[str]=None, setup: Optional[List[int]]=None,
+                    offset: Optional[int]=None, size: Optional[int]=None) -> Dict[int, FakeSetup]:
+        self._count('list_setups')
+        setup_ids = sorted(setup_id for setup_id in (self.setup_ids if setup is None else setup)
+                           if setup_id in self._setup_index and (flow is None or self.setup_flow_id[setup_id] == flow))
+        offset = 0 if offset is None else offset
+        setup_ids = setup_ids[offset:] if size is None else setup_ids[offset:offset + size]
+        result = dict()
+        for setup_id in setup_ids:
+            flow_id = self.setup_flow_id[setup_id]
+            parameter = FakeParameter(id=setup_id, flow_id=flow_id, flow_name='Flow_%d' % flow_id,
+                                      full_name='Flow_%d(1)_C' % flow_id, parameter_name='C', data_type='float',
+                                      default_value='1.0', value=str(float(setup_id)))
+            result[setup_id] = FakeSetup(setup_id=setup_id, flow_id=flow_id, parameters={setup_id: parameter})
+        return result
+
+    def get_flow(self, flow_id: int, *args, **kwargs) -> FakeFlow:
+        self._count('get_flow')
+        if flow_id not in self.setup_flow_id.values():
+            raise ValueError('Unknown flow %d' % flow_id)
+        return FakeFlow(flow_id=flow_id, name='Flow_%d' % flow_id, version='1')
+
+    @contextlib.contextmanager
+    def patch(self):
+        """
+        context manager that redirects the OpenML functions used by openmlaslib to this fake. The replacements keep
+        the signatures of the installed openml package, so a call that the real function would reject fails as well
+        """
+        def redirect(module, name, method):
+            return mock.patch.object(module, name, autospec=True, side_effect=method)
+
+        with redirect(openml.evaluations, 'list_evaluations', self.list_evaluations), \
+                redirect(openml._api_calls, '_perform_api_call', self.perform_api_call), \
+                redirect(openml.datasets, 'get_dataset', self.get_dataset), \
+                redirect(openml.setups, 'list_setups', self.list_setups), \
+                redirect(openml.flows, 'get_flow', self.get_flow):
+            yield self
+
+
+class FakeOpenMLServer(object):
+    """
+    local HTTP stand-in for the OpenML REST endpoints that are used to generate scenarios (evaluation/list,
+    data/qualities, setup/list and flow), serving the grid of a FakeOpenML. Use it as context manager, the url of the
+    API is available as url while it runs.
+
+    :param fake: FakeOpenML
+        the grid to serve
+    :param latency: float
+        the number of seconds every response is delayed (to simulate the latency of a remote server)
+    :param rate_limit_every: int
+        if set, every so many requests are answered with HTTP 429 (Too Many Requests) instead
+    :param retry_after: int
+        the value of the Retry-After header of rate limited responses
+    """
+
+    def __init__(self, fake: FakeOpenML, latency: float=0.0, rate_limit_every: int=0, retry_after: int=0):
+        self.fake = fake
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.requests = collections.Counter()
+        self.num_rate_limited = 0
+        self._num_requests = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return 'http://%s:%d/api/v1/xml' % self._server.server_address[:2]
+
+    def __enter__(self):
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                status, body, headers = server.handle(self.path.split('?')[0])
+                body = body.encode('utf-8')
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Type', 'text/xml; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    @staticmethod
+    def _error(code: int, message: str):
+        return 412, ('<oml:error xmlns:oml="http://openml.org/openml"><oml:code>%d</oml:code>'
+                     '<oml:message>%s</oml:message></oml:error>' % (code, message)), {}
+
+    def handle(self, path: str):
+        """
+        :return: tuple
+            the HTTP status, body and extra headers of the response to a GET request on path
+        """
+        if self.latency > 0:
+            time.sleep(self.latency)
+        call = path.split('/api/v1/xml/', 1)[-1]
+        with self._lock:
+            self._num_requests += 1
+            if self.rate_limit_every > 0 and self._num_requests % self.rate_limit_every == 0:
+                self.num_rate_limited += 1
+                return 429, '', {'Retry-After': str(self.retry_after)}
+            self.requests[call] += 1
+
+        parts = call.split('/')
+        filters = dict(zip(parts[2::2], parts[3::2]))
+        if call.startswith('evaluation/list/'):
+            return self._evaluations(filters)
+        if call.startswith('data/qualities/'):
+            try:
+                return 200, self.fake.perform_api_call(call), {}
+            except openml.exceptions.OpenMLServerException as e:
+                return self._error(e.code, e.message)
+        if call.startswith('setup/list/'):
+            return self._setups(filters)
+        if call.startswith('flow/'):
+            try:
+                flow = self.fake.get_flow(int(parts[1]))
+            except ValueError:
+                return self._error(181, 'Unknown flow')
+            return 200, ('<oml:flow xmlns:oml="http://openml.org/openml"><oml:id>%d</oml:id><oml:name>%s</oml:name>'
+                         '<oml:version>%s</oml:version></oml:flow>' % (flow.flow_id, flow.name, flow.version)), {}
+        return 404, '', {}
+
+    def _evaluations(self, filters: Dict[str, str]):
+        evaluations = self.fake.list_evaluations(filters['function'], offset=int(filters.get('offset', 0)),
+                                                 size=int(filters['limit']) if 'limit' in filters else None,
+                                                 tasks=[int(id) for id in filters['task'].split(',')]
+                                                 if 'task' in filters else None,
+                                                 setups=[int(id) for id in filters['setup'].split(',')]
+                                                 if 'setup' in filters else None)
+        if len(evaluations) == 0:
+            return self._error(542, 'No results')
+        body = ''.join('<oml:evaluation><oml:run_id>%d</oml:run_id><oml:task_id>%d</oml:task_id>'
+                       '<oml:setup_id>%d</oml:setup_id><oml:flow_id>%d</oml:flow_id><oml:data_id>%d</oml:data_id>'
+                       '<oml:function>%s</oml:function><oml:value>%s</oml:value></oml:evaluation>' %
+                       (evaluation.run_id, evaluation.task_id, evaluation.setup_id, evaluation.flow_id,
+                        evaluation.data_id, evaluation.function, repr(evaluation.value))
+                       for evaluation in evaluations.values())
+        return 200, '<oml:evaluations xmlns:oml="http://openml.org/openml">%s</oml:evaluations>' % body, {}
+
+    def _setups(self, filters: Dict[str, str]):
+        setups = self.fake.list_setups(setup=[int(id) for id in filters['setup'].split(',')]
+                                       if 'setup' in filters else None,
+                                       size=int(filters['limit']) if 'limit' in filters else None)
+        if len(setups) == 0:
+            return self._error(672, 'No results')
+        body = ''.join('<oml:setup><oml:setup_id>%d</oml:setup_id><oml:flow_id>%d</oml:flow_id>%s</oml:setup>' %
+                       (setup.setup_id, setup.flow_id,
+                        ''.join('<oml:parameter><oml:full_name>%s</oml:full_name>'
+                                '<oml:parameter_name>%s</oml:parameter_name><oml:value>%s</oml:value>'
+                                '</oml:parameter>' % (parameter.full_name, parameter.parameter_name, parameter.value)
+                                for parameter in setup.parameters.values()))
+                       for setup in setups.values())
+        return 200, '<oml:setups xmlns:oml="http://openml.org/openml">%s</oml:setups>' % body, {}
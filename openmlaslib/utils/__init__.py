@@ -1 +1,6 @@
-from .scenario import generate_scenario
+from .baselines import Baselines, load_baselines
+from .cache import MetadataCache
+from .profiling import Profiler
+from .scenario import ScenarioSpec, generate_scenario, generate_scenario_async, generate_scenarios
+from .sidecar import load_scenario_arrays
+from .sharding import generate_scenario_sharded
@@ -0,0 +1,111 @@
+import numpy as np
+
+from typing import Iterable, List, Sequence
+
+
+class RunningStatistics(object):
+    """
+    streaming aggregation of per-fold evaluations over a grid of (task, algorithm) cells. Every cell keeps the count,
+    mean and sum of squared deviations of all its fold values (merged with the algorithm of Chan et al., a batched
+    form of Welford's algorithm), and the mean of each repetition. Evaluations are added one at a time and can be
+    discarded afterwards, so the memory is bounded by the grid size and the number of repetitions per cell, not by the
+    number of folds.
+
+    :param task_ids: iterable
+        the task ids (rows)
+    :param algorithms: iterable
+        the algorithm names (columns)
+    """
+
+    def __init__(self, task_ids: Iterable[int], algorithms: Iterable[str]):
+        self.task_ids = list(dict.fromkeys(task_ids))
+        self.algorithms = list(dict.fromkeys(algorithms))
+        self.task_index = {task_id: idx for idx, task_id in enumerate(self.task_ids)}
+        self.algorithm_index = {algorithm: idx for idx, algorithm in enumerate(self.algorithms)}
+        shape = (len(self.task_ids), len(self.algorithms))
+        self.count = np.zeros(shape, dtype=np.int64)
+        self.mean = np.zeros(shape, dtype=np.float64)
+        self.m2 = np.zeros(shape, dtype=np.float64)
+        # the mean of every repetition of each cell, grown along the last axis when more repetitions are added
+        self.repetition_means = np.zeros(shape + (0,), dtype=np.float64)
+        self.num_repetitions = np.zeros(shape, dtype=np.int64)
+
+    def add(self, task_id: int, algorithm: str, values: Sequence):
+        """
+        adds the fold values of a run to a cell
+
+        :param values: list
+            the fold values per repetition (a list of lists, as listed by OpenML with per_fold), or a flat list of
+            fold values of a single repetition. Every repetition of a run becomes a new repetition of the cell
+        """
+        row, column = self.task_index[task_id], self.algorithm_index[algorithm]
+        if len(values) > 0 and not isinstance(values[0], (list, tuple, np.ndarray)):
+            values = [values]
+        for folds in values:
+            folds = np.asarray(folds, dtype=np.float64)
+            if folds.size == 0:
+                continue
+            batch_count, batch_mean = folds.size, float(folds.mean())
+            batch_m2 = float(((folds - batch_mean) ** 2).sum())
+            count = self.count[row, column]
+            delta = batch_mean - self.mean[row, column]
+            total = count + batch_count
+            self.mean[row, column] += delta * batch_count / total
+            self.m2[row, column] += batch_m2 + delta ** 2 * count * batch_count / total
+            self.count[row, column] = total
+
+            repetition = self.num_repetitions[row, column]
+            if repetition == self.repetition_means.shape[2]:
+                self.repetition_means = np.concatenate([self.repetition_means,
+                                                        np.zeros(self.repetition_means.shape[:2] + (1,))], axis=2)
+            self.repetition_means[row, column, repetition] = batch_mean
+            self.num_repetitions[row, column] = repetition + 1
+
+    @property
+    def observed(self) -> np.ndarray:
+        return self.count > 0
+
+    def std(self) -> np.ndarray:
+        """
+        :return: the sample standard deviation of the fold values of each cell (NaN for cells with less than two)
+        """
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.count > 1, np.sqrt(self.m2 / (self.count - 1)), np.nan)
+
+    def run_rows(self, task_ids: List[int], algorithms: List[str], fill_value=0):
+        """
+        generates the rows of algorithm_runs.arff, one at a time, with a row per repetition. Only the repetitions of
+        each cell are written, a cell that was not observed gets a single row with status other and the fill value as
+        performance
+
+        :param task_ids: list
+            the task ids to write (a subset of the rows, e.g., after pruning)
+        :param algorithms: list
+            the algorithms to write (a subset of the columns)
+        """
+        rows = [self.task_index[task_id] for task_id in task_ids]
+        columns = [self.algorithm_index[algorithm] for algorithm in algorithms]
+        num_repetitions = int(self.num_repetitions[np.ix_(rows, columns)].max()) if rows and columns else 0
+        for task_id, row in zip(task_ids, rows):
+            for repetition in range(max(num_repetitions, 1)):
+                for algorithm, column in zip(algorithms, columns):
+                    if repetition < self.num_repetitions[row, column]:
+                        yield [task_id, str(repetition + 1), algorithm,
+                               float(self.repetition_means[row, column, repetition]), 'ok']
+                    elif repetition == 0:
+                        yield [task_id, str(repetition + 1), algorithm, fill_value, 'other']
+
+    def statistics_rows(self, task_ids: List[int], algorithms: List[str]):
+        """
+        generates rows with the mean, standard deviation and number of fold values of each observed cell. Missing
+        standard deviations are None
+        """
+        std = self.std()
+        for task_id in task_ids:
+            row = self.task_index[task_id]
+            for algorithm in algorithms:
+                column = self.algorithm_index[algorithm]
+                if self.count[row, column] > 0:
+                    yield [task_id, algorithm, float(self.mean[row, column]),
+                           None if np.isnan(std[row, column]) else float(std[row, column]),
+                           int(self.count[row, column])]
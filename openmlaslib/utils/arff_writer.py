@@ -0,0 +1,25 @@
+import arff
+
+from typing import Any, Iterable, List, TextIO
+
+
+def dump_streaming(relation: str, attributes: List[List[Any]], rows: Iterable[List[Any]], fp: TextIO):
+    """
+    writes an ARFF file, encoding the rows one at a time as they are produced (e.g., from a generator). The output
+    is byte-identical to arff.dump on the same (materialized) content, but the rows never need to be in memory at once.
+
+    :param relation: str
+        the name of the relation
+    :param attributes: list
+        the attributes, as (name, type) pairs (same format as arff.dump)
+    :param rows: iterable
+        the data rows. Each row is a list with a value per attribute
+    :param fp: file
+        file-like object to write to
+    """
+    encoder = arff.ArffEncoder()
+    # without data, the encoder only yields the header, the @DATA marker, and an empty closing line
+    header = list(encoder.iter_encode({'relation': relation, 'attributes': attributes}))[:-1]
+    fp.write(u'\n'.join(header) + u'\n')
+    for line in arff.Data().encode_data(rows, attributes):
+        fp.write(line + u'\n')
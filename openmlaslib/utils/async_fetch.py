@@ -0,0 +1,296 @@
+import asyncio
+import collections
+import concurrent.futures
+import openml
+import requests
+import requests.adapters
+import xmltodict
+
+from .cache import MetadataCache
+from .fetch import _chunks
+from .profiling import Profiler
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+
+Evaluation = collections.namedtuple('Evaluation', ['run_id', 'task_id', 'setup_id', 'flow_id', 'data_id', 'value'])
+Parameter = collections.namedtuple('Parameter', ['full_name', 'parameter_name', 'value'])
+Setup = collections.namedtuple('Setup', ['setup_id', 'flow_id', 'parameters'])
+Flow = collections.namedtuple('Flow', ['flow_id', 'name', 'version'])
+
+
+class AsyncOpenMLClient(object):
+    """
+    asynchronous client for the OpenML REST API. All requests share a pool of HTTP connections, the number of
+    requests in flight is capped, rate limits and errors of the server (HTTP 429 / 5xx) are retried with backoff, and
+    identical requests that are in flight at the same time are combined into one. The client can be used from several
+    event loops after each other (e.g., multiple calls of asyncio.run), but not from several loops at the same time.
+
+    :param server: str
+        the url of the OpenML REST API (default: the server that is configured for openml)
+    :param apikey: str
+        the OpenML API key (default: the key that is configured for openml)
+    :param max_in_flight: int
+        the maximum number of requests that are in flight at the same time (also the size of the connection pool)
+    :param max_retries: int
+        the number of times a request is retried after a rate limit, server error, connection error or timeout
+    :param backoff: float
+        the number of seconds waited before the first retry (unless the server sends Retry-After). This doubles for
+        every subsequent retry
+    :param timeout: float
+        the number of seconds to wait for the server to respond, before the request is considered failed (so a
+        stalled connection does not occupy a slot forever)
+    """
+
+    def __init__(self, server: Optional[str]=None, apikey: Optional[str]=None, max_in_flight: int=8,
+                 max_retries: int=5, backoff: float=1.0, timeout: float=60.0):
+        if max_in_flight < 1:
+            raise ValueError('max_in_flight should be at least 1, got %d' % max_in_flight)
+        self.server = (openml.config.server if server is None else server).rstrip('/')
+        self.apikey = openml.config.apikey if apikey is None else apikey
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.num_requests = 0
+        self._session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=max_in_flight)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        # the blocking requests are executed in these threads, so the event loop is never blocked
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_in_flight)
+        # the semaphore (and the requests in flight) belong to the event loop that created them
+        self._loop = None
+        self._semaphore = None
+        self._in_flight = dict()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self._session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        self.close()
+
+    async def get(self, call: str, profiler: Optional[Profiler]=None) -> Optional[str]:
+        """
+        performs a GET request on the API
+
+        :param call: str
+            the call, relative to the server url (e.g., 'data/qualities/61')
+        :param profiler: Profiler
+            if set, the request and the number of received bytes are recorded in its current phase
+        :return: str
+            the response, or None if the server reported that there are no results (or no qualities)
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+            self._in_flight = dict()
+        if call not in self._in_flight:
+            task = asyncio.ensure_future(self._request(call, profiler))
+            self._in_flight[call] = task
+            in_flight = self._in_flight
+            task.add_done_callback(lambda _: in_flight.pop(call, None))
+        return await self._in_flight[call]
+
+    async def _request(self, call: str, profiler: Optional[Profiler]) -> Optional[str]:
+        url = '%s/%s' % (self.server, call)
+        params = {'api_key': self.apikey} if self.apikey else None
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.max_retries + 1):
+            async with self._semaphore:
+                try:
+                    response = await loop.run_in_executor(self._executor,
+                                                          lambda: self._session.get(url, params=params,
+                                                                                    timeout=self.timeout))
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                    if attempt == self.max_retries:
+                        raise
+                    response = None
+            if response is not None:
+                self.num_requests += 1
+                if profiler is not None:
+                    profiler.record_api_call(num_bytes=len(response.content))
+                if response.status_code == 200:
+                    return response.text
+                # no results, or no qualities that were computed for a dataset (error 362)
+                if response.status_code == 412 and ('No results' in response.text or
+                                                    '<oml:code>362</oml:code>' in response.text):
+                    return None
+                if (response.status_code != 429 and response.status_code < 500) or attempt == self.max_retries:
+                    raise openml.exceptions.OpenMLServerError('Request %s failed with status %d: %s' %
+                                                              (call, response.status_code, response.text))
+            # rate limited (or server error, connection error or timeout), wait before retrying
+            delay = self.backoff * 2 ** attempt
+            if response is not None and response.headers.get('Retry-After', '').isdigit():
+                delay = float(response.headers['Retry-After'])
+            await asyncio.sleep(delay)
+
+    async def list_evaluations(self, measure: str, setup_ids: List[int], task_ids: List[int], offset: int, size: int,
+                               profiler: Optional[Profiler]=None) -> List[Evaluation]:
+        call = 'evaluation/list/function/%s/setup/%s/task/%s/limit/%d/offset/%d' % \
+               (measure, ','.join(map(str, setup_ids)), ','.join(map(str, task_ids)), size, offset)
+        xml_string = await self.get(call, profiler)
+        if xml_string is None:
+            return []
+        xml_dict = xmltodict.parse(xml_string, force_list=('oml:evaluation',))
+        return [Evaluation(run_id=int(evaluation['oml:run_id']), task_id=int(evaluation['oml:task_id']),
+                           setup_id=int(evaluation['oml:setup_id']), flow_id=int(evaluation['oml:flow_id']),
+                           data_id=int(evaluation['oml:data_id']),
+                           value=float(evaluation['oml:value']) if evaluation.get('oml:value') is not None else None)
+                for evaluation in xml_dict['oml:evaluations'].get('oml:evaluation', [])]
+
+    async def get_qualities(self, data_id: int, profiler: Optional[Profiler]=None) -> Dict[str, float]:
+        xml_string = await self.get('data/qualities/%d' % data_id, profiler)
+        qualities = dict()
+        if xml_string is None:
+            return qualities
+        xml_dict = xmltodict.parse(xml_string, force_list=('oml:quality',))
+        for quality in xml_dict['oml:data_qualities'].get('oml:quality', []):
+            value = quality.get('oml:value')
+            qualities[quality['oml:name']] = float(value) if value is not None else None
+        return qualities
+
+    async def list_setups(self, setup_ids: List[int], profiler: Optional[Profiler]=None) -> Dict[int, Setup]:
+        call = 'setup/list/setup/%s/limit/%d' % (','.join(map(str, setup_ids)), len(setup_ids))
+        xml_string = await self.get(call, profiler)
+        if xml_string is None:
+            return dict()
+        xml_dict = xmltodict.parse(xml_string, force_list=('oml:setup', 'oml:parameter'))
+        setups = dict()
+        for setup in xml_dict['oml:setups'].get('oml:setup', []):
+            parameters = {idx: Parameter(full_name=parameter['oml:full_name'],
+                                         parameter_name=parameter['oml:parameter_name'],
+                                         value=parameter.get('oml:value'))
+                          for idx, parameter in enumerate(setup.get('oml:parameter', []))}
+            setups[int(setup['oml:setup_id'])] = Setup(setup_id=int(setup['oml:setup_id']),
+                                                       flow_id=int(setup['oml:flow_id']), parameters=parameters)
+        return setups
+
+    async def get_flow(self, flow_id: int, profiler: Optional[Profiler]=None) -> Flow:
+        xml_string = await self.get('flow/%d' % flow_id, profiler)
+        if xml_string is None:
+            raise ValueError('Did not retrieve flow %d' % flow_id)
+        flow = xmltodict.parse(xml_string)['oml:flow']
+        return Flow(flow_id=int(flow['oml:id']), name=flow['oml:name'], version=flow['oml:version'])
+
+
+async def _cached_fetch_async(cache: Optional[MetadataCache], entity: str, ids: Iterable[Any], measure: str,
+                              fetch_missing: Callable[[List[Any]], Awaitable[Dict[Any, Any]]],
+                              profiler: Optional[Profiler]=None) -> Dict[Any, Any]:
+    """
+    Helper function that serves the ids that are present in the cache, and obtains (and stores) the other ones
+    using fetch_missing (the asynchronous counterpart of fetch._cached_fetch)
+    """
+    ids = list(ids)
+    if cache is None:
+        return await fetch_missing(ids)
+    result = cache.get_many(entity, ids, measure)
+    missing = [id for id in ids if id not in result]
+    if profiler is not None:
+        profiler.record_cache_lookup(len(result), len(missing))
+    if len(missing) > 0:
+        if cache.offline:
+            raise ValueError('Cache runs in offline mode, but %d %s are not in the cache (e.g., %s)' %
+                             (len(missing), entity, missing[0]))
+        obtained = await fetch_missing(missing)
+        cache.put_many(entity, obtained, measure)
+        result.update(obtained)
+    return result
+
+
+async def fetch_evaluations_async(client: AsyncOpenMLClient, measure: str, setup_ids: Iterable[int],
+                                  task_ids: Iterable[int], chunk_size: int=100, page_size: int=10000,
+                                  cache: Optional[MetadataCache]=None,
+                                  profiler: Optional[Profiler]=None) -> Dict[int, Evaluation]:
+    """
+    asynchronous counterpart of fetch.fetch_evaluations. All chunks are listed concurrently (the number of requests in
+    flight is capped by the client)
+
+    :return: dict
+        mapping from run id to the evaluation
+    """
+    if chunk_size < 1 or page_size < 1:
+        raise ValueError('chunk_size and page_size should be at least 1')
+
+    async def list_chunk(setup_chunk, task_chunk):
+        evaluations = []
+        offset = 0
+        while True:
+            page = await client.list_evaluations(measure, setup_chunk, task_chunk, offset, page_size, profiler)
+            evaluations.extend(page)
+            if len(page) < page_size:
+                return evaluations
+            offset += page_size
+
+    async def fetch_grid(grid_setup_ids, grid_task_ids):
+        chunks = [list_chunk(setup_chunk, task_chunk) for setup_chunk in _chunks(grid_setup_ids, chunk_size)
+                  for task_chunk in _chunks(grid_task_ids, chunk_size)]
+        return [evaluation for chunk in await asyncio.gather(*chunks) for evaluation in chunk]
+
+    if cache is None:
+        return {evaluation.run_id: evaluation for evaluation in await fetch_grid(setup_ids, task_ids)}
+
+    async def fetch_missing(missing_cells):
+        # requests the smallest grid that covers all missing cells
+        missing_setup_ids = {setup_id for _, setup_id in missing_cells}
+        missing_task_ids = {task_id for task_id, _ in missing_cells}
+        cell_evaluations = {(task_id, setup_id): [] for task_id in missing_task_ids for setup_id in missing_setup_ids}
+        for evaluation in await fetch_grid(missing_setup_ids, missing_task_ids):
+            cell_evaluations[(evaluation.task_id, evaluation.setup_id)].append(evaluation)
+        return cell_evaluations
+
+    cells = [(task_id, setup_id) for task_id in sorted(set(task_ids)) for setup_id in sorted(set(setup_ids))]
+    cell_evaluations = await _cached_fetch_async(cache, 'evaluations', cells, measure, fetch_missing, profiler)
+    return {evaluation.run_id: evaluation for cell in cells for evaluation in cell_evaluations[cell]}
+
+
+async def fetch_qualities_async(client: AsyncOpenMLClient, data_ids: Iterable[int],
+                                cache: Optional[MetadataCache]=None,
+                                profiler: Optional[Profiler]=None) -> Dict[int, Dict[str, float]]:
+    """
+    asynchronous counterpart of fetch.fetch_qualities
+
+    :return: dict
+        mapping from dataset id to a dict mapping from quality name to value
+    """
+    async def fetch_missing(missing_data_ids):
+        results = await asyncio.gather(*[client.get_qualities(data_id, profiler) for data_id in missing_data_ids])
+        return dict(zip(missing_data_ids, results))
+
+    return await _cached_fetch_async(cache, 'qualities', sorted(set(data_ids)), '', fetch_missing, profiler)
+
+
+async def fetch_setups_async(client: AsyncOpenMLClient, setup_ids: Iterable[int], chunk_size: int=100,
+                             cache: Optional[MetadataCache]=None,
+                             profiler: Optional[Profiler]=None) -> Dict[int, Setup]:
+    """
+    asynchronous counterpart of fetch.fetch_setups
+
+    :return: dict
+        mapping from setup id to setup. Setups that are not known on OpenML are omitted
+    """
+    async def fetch_missing(missing_setup_ids):
+        chunks = await asyncio.gather(*[client.list_setups(setup_chunk, profiler)
+                                        for setup_chunk in _chunks(missing_setup_ids, chunk_size)])
+        return {setup_id: setup for chunk in chunks for setup_id, setup in chunk.items()}
+
+    return await _cached_fetch_async(cache, 'setups', sorted(set(setup_ids)), '', fetch_missing, profiler)
+
+
+async def fetch_flows_async(client: AsyncOpenMLClient, flow_ids: Iterable[int], cache: Optional[MetadataCache]=None,
+                            profiler: Optional[Profiler]=None) -> Dict[int, Flow]:
+    """
+    asynchronous counterpart of fetch.fetch_flows
+
+    :return: dict
+        mapping from flow id to flow
+    """
+    async def fetch_missing(missing_flow_ids):
+        results = await asyncio.gather(*[client.get_flow(flow_id, profiler) for flow_id in missing_flow_ids])
+        return dict(zip(missing_flow_ids, results))
+
+    return await _cached_fetch_async(cache, 'flows', sorted(set(flow_ids)), '', fetch_missing, profiler)
@@ -0,0 +1,173 @@
+import arff
+import collections
+import json
+import numpy as np
+import os
+import yaml
+
+from .matrix import PerformanceMatrix
+from .sidecar import SIDECAR_DIR, load_scenario_arrays
+from typing import Any, Dict
+
+
+# OpenML evaluation measures for which lower values are better. All other measures are maximized
+MINIMIZE_MEASURES = {'mean_absolute_error', 'mean_prior_absolute_error', 'relative_absolute_error',
+                     'root_mean_squared_error', 'root_mean_prior_squared_error', 'root_relative_squared_error',
+                     'prior_entropy', 'usercpu_time_millis', 'usercpu_time_millis_training',
+                     'usercpu_time_millis_testing', 'wall_clock_time_millis', 'wall_clock_time_millis_training',
+                     'wall_clock_time_millis_testing', 'run_cpu_time', 'run_memory', 'run_virtual_memory'}
+
+
+def is_maximized(measure: str) -> bool:
+    """
+    :return: whether higher values of an OpenML evaluation measure are better
+    """
+    return measure not in MINIMIZE_MEASURES
+
+
+class Baselines(object):
+    """
+    baselines of a scenario, computed with vectorized operations on the performance matrix: the virtual best solver
+    (the best algorithm on every task), the single best solver (the algorithm that is best on average), its
+    leave-one-task-out variant (the single best solver determined without the task it is applied to), and the regret
+    of every algorithm on every task. Cells that were not observed count as the worst observed performance on their
+    task.
+
+    :param performance: PerformanceMatrix
+        the performance matrix. Every task should have at least one observed cell
+    :param maximize: bool
+        whether higher values are better
+    """
+
+    def __init__(self, performance: PerformanceMatrix, maximize: bool):
+        if performance.shape[0] == 0 or performance.shape[1] == 0:
+            raise ValueError('Can not compute baselines on an empty performance matrix')
+        if not performance.observed.any(axis=1).all():
+            raise ValueError('Can not compute baselines, not every task has an observed cell')
+        self.performance = performance
+        self.maximize = maximize
+        # scores are maximized in both cases, missing cells get the worst observed score of the task
+        scores = np.where(performance.observed, performance.values if maximize else -performance.values, np.inf)
+        worst = scores.min(axis=1, keepdims=True)
+        scores = np.where(performance.observed, scores, worst)
+        self._sign = 1.0 if maximize else -1.0
+        self.scores = scores
+        self.oracle = np.argmax(scores, axis=1)
+        self.regret = scores.max(axis=1, keepdims=True) - scores
+
+        totals = scores.sum(axis=0)
+        self.single_best = int(np.argmax(totals))
+        num_tasks = scores.shape[0]
+        if num_tasks > 1:
+            # the totals without each task, a row per left out task
+            self.leave_one_out = np.argmax((totals[np.newaxis, :] - scores) / (num_tasks - 1), axis=1)
+        else:
+            self.leave_one_out = np.array([self.single_best])
+
+    def _evaluate(self, rows: np.ndarray, columns: np.ndarray) -> Dict[str, float]:
+        """
+        Helper function that summarizes the performance of selecting algorithm columns[i] on task rows[i]
+        """
+        scores = self.scores[rows, columns]
+        regret = self.regret[rows, columns]
+        single_best_regret = self.regret[rows, self.single_best].mean()
+        return {'mean_performance': float(self._sign * scores.mean()),
+                'mean_regret': float(regret.mean()),
+                'num_solved': int(self.performance.observed[rows, columns].sum()),
+                'gap_closed': float(1 - regret.mean() / single_best_regret) if single_best_regret > 0 else None}
+
+    def score_selection(self, selection: Dict[int, str]) -> Dict[str, float]:
+        """
+        scores a selection of an algorithm per task against the scenario
+
+        :param selection: dict
+            mapping from task id to the selected algorithm. Tasks that are not in the mapping are not scored
+        :return: dict
+            the mean performance and mean regret of the selection, the number of tasks on which the selected
+            algorithm has a result, and the fraction of the gap between the single best solver and the virtual best
+            solver that is closed (None if there is no gap)
+        """
+        unknown_tasks = set(selection) - set(self.performance.task_index)
+        if len(unknown_tasks) > 0:
+            raise ValueError('Tasks not in scenario: %s' % sorted(unknown_tasks))
+        unknown_algorithms = set(selection.values()) - set(self.performance.algorithm_index)
+        if len(unknown_algorithms) > 0:
+            raise ValueError('Algorithms not in scenario: %s' % sorted(unknown_algorithms))
+        rows = np.array([self.performance.task_index[task_id] for task_id in selection], dtype=np.int64)
+        columns = np.array([self.performance.algorithm_index[algorithm] for algorithm in selection.values()],
+                           dtype=np.int64)
+        return self._evaluate(rows, columns)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        :return: dict
+            the baselines and the summary of every algorithm, per task and on average
+        """
+        rows = np.arange(self.performance.shape[0])
+        single_best = np.full(len(rows), self.single_best)
+        algorithms = self.performance.algorithms
+        task_keys = [str(task_id) for task_id in self.performance.task_ids]
+        mean_scores = self.scores.mean(axis=0)
+        mean_regret = self.regret.mean(axis=0)
+        coverage = self.performance.observed.mean(axis=0)
+
+        virtual_best = self._evaluate(rows, self.oracle)
+        virtual_best['selection'] = dict(zip(task_keys, [algorithms[idx] for idx in self.oracle]))
+        single_best_summary = self._evaluate(rows, single_best)
+        single_best_summary['algorithm'] = algorithms[self.single_best]
+        single_best_summary['regret'] = dict(zip(task_keys, self.regret[rows, single_best].tolist()))
+        leave_one_out = self._evaluate(rows, self.leave_one_out)
+        leave_one_out['selection'] = dict(zip(task_keys, [algorithms[idx] for idx in self.leave_one_out]))
+        leave_one_out['regret'] = dict(zip(task_keys, self.regret[rows, self.leave_one_out].tolist()))
+        return {'maximize': self.maximize,
+                'virtual_best': virtual_best,
+                'single_best': single_best_summary,
+                'leave_one_task_out_single_best': leave_one_out,
+                'algorithms': collections.OrderedDict(
+                    (algorithm, {'mean_performance': float(self._sign * mean_scores[idx]),
+                                 'mean_regret': float(mean_regret[idx]),
+                                 'coverage': float(coverage[idx])})
+                    for idx, algorithm in enumerate(algorithms))}
+
+    def write(self, path: str):
+        """
+        stores the baselines as json
+        """
+        with open(path, 'w') as fp:
+            json.dump(self.to_dict(), fp, indent=2)
+
+
+def load_baselines(directory: str) -> Baselines:
+    """
+    computes the baselines of a scenario on disk. The binary copy is used if it exists, otherwise algorithm_runs.arff
+    is read (the repetitions of each cell are averaged)
+
+    :param directory: str
+        the directory of the scenario
+    :return: Baselines
+        the baselines, which can score selections with score_selection
+    """
+    with open(os.path.join(directory, 'description.txt'), 'r') as fp:
+        description = yaml.safe_load(fp)
+    maximize = bool(description['maximize'][0])
+
+    if os.path.isdir(os.path.join(directory, SIDECAR_DIR)):
+        arrays = load_scenario_arrays(directory, mmap=False)
+        performance = PerformanceMatrix(arrays.task_ids.tolist(), arrays.algorithms)
+        performance.values = np.asarray(arrays.performance, dtype=np.float64)
+        performance.observed = arrays.runstatus == 0
+        return Baselines(performance, maximize)
+
+    with open(os.path.join(directory, 'algorithm_runs.arff'), 'r') as fp:
+        data = arff.load(fp)['data']
+    ok_rows = [row for row in data if row[4] == 'ok']
+    performance = PerformanceMatrix([int(row[0]) for row in data], [row[2] for row in data])
+    totals = np.zeros(performance.shape, dtype=np.float64)
+    counts = np.zeros(performance.shape, dtype=np.int64)
+    rows = np.array([performance.task_index[int(row[0])] for row in ok_rows], dtype=np.int64)
+    columns = np.array([performance.algorithm_index[row[2]] for row in ok_rows], dtype=np.int64)
+    np.add.at(totals, (rows, columns), np.array([row[3] for row in ok_rows], dtype=np.float64))
+    np.add.at(counts, (rows, columns), 1)
+    performance.observed = counts > 0
+    performance.values = np.divide(totals, counts, out=np.zeros_like(totals), where=counts > 0)
+    return Baselines(performance, maximize)
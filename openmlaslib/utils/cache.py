@@ -0,0 +1,100 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from typing import Any, Dict, Iterable, Optional
+
+
+class MetadataCache(object):
+    """
+    on-disk cache for metadata obtained from OpenML (evaluations, qualities, setups and flows). All entries are stored
+    in a single SQLite index, keyed by (entity, id, measure).
+
+    :param path: str
+        location of the SQLite file. The directory is created if it does not exist
+    :param ttl: float
+        time to live of an entry (in seconds). Expired entries are treated as missing and removed. None means that
+        entries never expire
+    :param max_size: int
+        maximum total size (in bytes) of the stored values. When exceeded, the least recently used entries are evicted.
+        None means that the cache can grow unbounded
+    :param offline: bool
+        if True, no requests should be made to OpenML. The fetch functions will raise an error on a cache miss
+    """
+
+    def __init__(self, path: str, ttl: Optional[float]=None, max_size: Optional[int]=None, offline: bool=False):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.ttl = ttl
+        self.max_size = max_size
+        self.offline = offline
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute('CREATE TABLE IF NOT EXISTS entries ('
+                                     'entity TEXT NOT NULL, id TEXT NOT NULL, measure TEXT NOT NULL, '
+                                     'value BLOB NOT NULL, size INTEGER NOT NULL, '
+                                     'created REAL NOT NULL, accessed REAL NOT NULL, '
+                                     'PRIMARY KEY (entity, id, measure))')
+            self._connection.execute('CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)')
+
+    def close(self):
+        self._connection.close()
+
+    def get_many(self, entity: str, ids: Iterable[Any], measure: str='') -> Dict[Any, Any]:
+        """
+        looks up several entries of the same entity (and measure)
+
+        :return: dict
+            mapping from id to value, for all ids that are present in the cache (and not expired)
+        """
+        ids = list(ids)
+        key_id = {str(id): id for id in ids}
+        now = time.time()
+        result = dict()
+        with self._lock, self._connection:
+            if self.ttl is not None:
+                self._connection.execute('DELETE FROM entries WHERE created < ?', (now - self.ttl,))
+            # stay below the maximum number of SQLite variables
+            keys = list(key_id.keys())
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                query = 'SELECT id, value FROM entries WHERE entity = ? AND measure = ? AND id IN (%s)' % \
+                        ','.join('?' * len(chunk))
+                for key, value in self._connection.execute(query, [entity, measure] + chunk):
+                    result[key_id[key]] = pickle.loads(value)
+                self._connection.execute('UPDATE entries SET accessed = ? WHERE entity = ? AND measure = ? AND '
+                                         'id IN (%s)' % ','.join('?' * len(chunk)), [now, entity, measure] + chunk)
+        return result
+
+    def put_many(self, entity: str, values: Dict[Any, Any], measure: str=''):
+        """
+        stores several entries of the same entity (and measure), and evicts entries if the cache became too large
+        """
+        now = time.time()
+        rows = []
+        for id, value in values.items():
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            rows.append((entity, str(id), measure, blob, len(blob), now, now))
+        with self._lock, self._connection:
+            self._connection.executemany('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+            if self.max_size is not None:
+                self._evict()
+
+    def _evict(self):
+        """
+        Helper function that removes the least recently used entries until the total size is below max_size
+        """
+        total_size = self._connection.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        if total_size <= self.max_size:
+            return
+        to_remove = []
+        for rowid, size in self._connection.execute('SELECT rowid, size FROM entries ORDER BY accessed'):
+            if total_size <= self.max_size:
+                break
+            to_remove.append((rowid,))
+            total_size -= size
+        self._connection.executemany('DELETE FROM entries WHERE rowid = ?', to_remove)
@@ -0,0 +1,111 @@
+import collections
+import numpy as np
+import re
+
+from typing import Dict, Iterable
+
+
+# feature matrix of a scenario. values has a row per task and a column per feature (missing values are NaN), observed
+# indicates which values are known. steps maps each feature step to the features it provides, step_observed has a
+# row per task and a column per step (True when at least one feature of the step is known)
+FeatureMatrix = collections.namedtuple('FeatureMatrix', ['task_ids', 'feature_names', 'values', 'observed', 'steps',
+                                                         'step_observed'])
+
+# families of OpenML qualities, used as feature steps. A quality belongs to the first family of which the regular
+# expression matches its name, the remaining qualities are in family 'other'
+QUALITY_FAMILIES = [
+    ('landmarking', re.compile(r'^(CfsSubsetEval_)?(DecisionStump|J48|kNN1N|NaiveBayes|REPTree|RandomTree|'
+                               r'LinearDiscriminant)')),
+    ('information_theoretic', re.compile(r'Entropy|MutualInformation|EquivalentNumberOfAtts|NoiseToSignalRatio')),
+    # the minimum and maximum of the other statistics are matched by these, only the ones of the number of distinct
+    # values need their own pattern (a bare Min prefix would also match MinorityClass)
+    ('statistical', re.compile(r'Kurtosis|Skewness|StdDev|Quartile|Means?Of|^(Min|Max)NominalAtt')),
+    ('simple', re.compile(r'^(NumberOf|PercentageOf|Dimensionality|MajorityClass|MinorityClass|AutoCorrelation)')),
+]
+
+
+def quality_family(quality_name: str) -> str:
+    """
+    :return: the family of a quality (landmarking, information_theoretic, statistical, simple or other)
+    """
+    for family, expression in QUALITY_FAMILIES:
+        if expression.search(quality_name):
+            return family
+    return 'other'
+
+
+def build_feature_matrix(task_ids: Iterable[int], task_qualities: Dict[int, Dict[str, float]],
+                         min_coverage: float=1.0) -> FeatureMatrix:
+    """
+    assembles the feature matrix of a scenario from the qualities of each task. All qualities are gathered in a
+    single pass, after which the qualities that are known on less than a fraction min_coverage of the tasks are
+    removed. Tasks without any quality are not taken into account for the coverage (these are marked as missing)
+
+    :param task_ids: iterable
+        the task ids (rows), in the order in which they will be written
+    :param task_qualities: dict
+        mapping from task id to a dict mapping from quality name to value (None for unknown values)
+    :param min_coverage: float
+        the minimal fraction of tasks on which a quality should be known to be used as feature (1.0 means that only
+        the qualities that are known on all tasks are used)
+    :return: FeatureMatrix
+        the feature matrix, with features sorted by name
+    """
+    if not 0 <= min_coverage <= 1:
+        raise ValueError('min_coverage should be in [0, 1], got %s' % min_coverage)
+    task_ids = list(task_ids)
+    quality_index = dict()
+    rows, columns, values = [], [], []
+    for row, task_id in enumerate(task_ids):
+        for name, value in task_qualities.get(task_id, {}).items():
+            if value is not None:
+                rows.append(row)
+                columns.append(quality_index.setdefault(name, len(quality_index)))
+                values.append(value)
+
+    all_values = np.full((len(task_ids), len(quality_index)), np.nan, dtype=np.float64)
+    all_observed = np.zeros((len(task_ids), len(quality_index)), dtype=bool)
+    all_values[rows, columns] = values
+    all_observed[rows, columns] = True
+
+    has_qualities = all_observed.any(axis=1)
+    coverage = all_observed[has_qualities].mean(axis=0) if has_qualities.any() else np.zeros(len(quality_index))
+    kept = sorted(name for name, column in quality_index.items() if coverage[column] >= min_coverage - 1e-9)
+    kept_columns = [quality_index[name] for name in kept]
+    feature_values = all_values[:, kept_columns]
+    feature_observed = all_observed[:, kept_columns]
+
+    families = [quality_family(name) for name in kept]
+    steps = collections.OrderedDict()
+    for family in [family for family, _ in QUALITY_FAMILIES] + ['other']:
+        columns_of_family = [column for column, name in enumerate(families) if name == family]
+        if len(columns_of_family) > 0:
+            steps[family] = columns_of_family
+    if len(steps) > 0:
+        step_observed = np.stack([feature_observed[:, step_columns].any(axis=1) for step_columns in steps.values()],
+                                 axis=1)
+    else:
+        # ASlib requires a feature step, even when there are no features
+        steps['ALL'] = []
+        step_observed = has_qualities[:, np.newaxis]
+    return FeatureMatrix(task_ids=task_ids, feature_names=kept, values=feature_values, observed=feature_observed,
+                         steps=collections.OrderedDict((step, [kept[column] for column in step_columns])
+                                                       for step, step_columns in steps.items()),
+                         step_observed=step_observed)
+
+
+def feature_rows(features: FeatureMatrix):
+    """
+    generates the rows of feature_values.arff, one at a time. Missing values are None (written as '?')
+    """
+    for task_id, values, observed in zip(features.task_ids, features.values.tolist(), features.observed.tolist()):
+        yield [task_id, '1'] + [value if is_observed else None for value, is_observed in zip(values, observed)]
+
+
+def feature_runstatus_rows(features: FeatureMatrix):
+    """
+    generates the rows of feature_runstatus.arff, one at a time. A step has status ok on a task when at least one of
+    its features is known, and other when none of them are
+    """
+    for task_id, observed in zip(features.task_ids, features.step_observed.tolist()):
+        yield [task_id, '1'] + ['ok' if is_observed else 'other' for is_observed in observed]
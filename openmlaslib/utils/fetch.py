@@ -0,0 +1,399 @@
+import collections
+import concurrent.futures
+import inspect
+import itertools
+import openml
+import time
+import xmltodict
+
+from .cache import MetadataCache
+from .profiling import Profiler
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+def _chunks(ids: Iterable[int], chunk_size: int) -> List[List[int]]:
+    """
+    Helper function that splits a collection of ids into sorted, deduplicated chunks of at most chunk_size
+    """
+    unique_ids = sorted(set(ids))
+    return [unique_ids[i:i + chunk_size] for i in range(0, len(unique_ids), chunk_size)]
+
+
+def _is_transient(error: Exception) -> bool:
+    """
+    Helper function that determines whether a failed request might succeed when retried: connection errors, server
+    errors without an OpenML error response (e.g., a 5xx or rate limit page of the web server) and the database
+    connection error of OpenML (code 107). Other OpenML error responses (e.g., unknown ids, no results) are permanent
+    """
+    if isinstance(error, IOError):
+        return True
+    if isinstance(error, openml.exceptions.OpenMLServerException):
+        return error.code == 107
+    return type(error) is openml.exceptions.OpenMLServerError and not error.message.startswith('URI too long')
+
+
+def _with_retry(function: Callable, max_retries: int, backoff: float):
+    """
+    Helper function that calls a function, and retries it with exponential backoff on transient server and connection
+    errors
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return function()
+        except (openml.exceptions.OpenMLServerError, IOError) as e:
+            if attempt == max_retries or not _is_transient(e):
+                raise
+            time.sleep(backoff * 2 ** attempt)
+
+
+def _cached_fetch(cache: Optional[MetadataCache], entity: str, ids: Iterable[Any], measure: str,
+                  fetch_missing: Callable[[List[Any]], Dict[Any, Any]],
+                  profiler: Optional[Profiler]=None, refresh: bool=False, store: bool=True) -> Dict[Any, Any]:
+    """
+    Helper function that serves the ids that are present in the cache, and obtains (and stores) the other ones
+    using fetch_missing. With refresh, all ids are obtained again (unless the cache runs in offline mode). Without
+    store, fetch_missing stores what it obtains itself (e.g., as soon as part of it is obtained)
+    """
+    ids = list(ids)
+    if cache is None:
+        return fetch_missing(ids)
+    result = dict() if refresh and not cache.offline else cache.get_many(entity, ids, measure)
+    missing = [id for id in ids if id not in result]
+    if profiler is not None:
+        profiler.record_cache_lookup(len(result), len(missing))
+    if len(missing) > 0:
+        if cache.offline:
+            raise ValueError('Cache runs in offline mode, but %d %s are not in the cache (e.g., %s)' %
+                             (len(missing), entity, missing[0]))
+        obtained = fetch_missing(missing)
+        if store:
+            cache.put_many(entity, obtained, measure)
+        result.update(obtained)
+    return result
+
+
+def _perform_get_call(call: str) -> str:
+    """
+    Helper function that performs a GET call on the OpenML API. The private _perform_api_call of recent versions of
+    the openml package requires the request method as argument, older versions do not accept it
+    """
+    if 'request_method' in inspect.signature(openml._api_calls._perform_api_call).parameters:
+        return openml._api_calls._perform_api_call(call, 'get')
+    return openml._api_calls._perform_api_call(call)
+
+
+def _get_qualities(data_id: int, profiler: Optional[Profiler]=None) -> Dict[str, float]:
+    """
+    Helper function that obtains only the qualities of a single dataset (without downloading the dataset itself). A
+    dataset of which no qualities were computed has none (like in AsyncOpenMLClient.get_qualities)
+    """
+    try:
+        xml_string = _perform_get_call('data/qualities/%d' % data_id)
+    except openml.exceptions.OpenMLServerException as e:
+        # error 362: no qualities found
+        if not isinstance(e, openml.exceptions.OpenMLServerNoResult) and e.code != 362:
+            raise
+        return dict()
+    if profiler is not None:
+        profiler.record_api_call(num_bytes=len(xml_string.encode('utf-8')))
+    xml_dict = xmltodict.parse(xml_string, force_list=('oml:quality',))
+    qualities = dict()
+    for quality in xml_dict['oml:data_qualities'].get('oml:quality', []):
+        value = quality.get('oml:value')
+        qualities[quality['oml:name']] = float(value) if value is not None else None
+    return qualities
+
+
+def _evaluation_filters(setup_ids: List[int], task_ids: List[int]) -> Dict[str, List[int]]:
+    """
+    Helper function that names the setup and task filters of list_evaluations. Recent versions of the openml package
+    call these setups and tasks, older versions setup and task
+    """
+    if 'setup' in inspect.signature(openml.evaluations.list_evaluations).parameters:
+        return {'setup': setup_ids, 'task': task_ids}
+    return {'setups': setup_ids, 'tasks': task_ids}
+
+
+def _get_evaluations_chunk(measure: str, setup_ids: List[int], task_ids: List[int], page_size: int,
+                           max_retries: int, backoff: float, profiler: Optional[Profiler]=None,
+                           per_fold: bool=False) -> Dict[int, openml.evaluations.OpenMLEvaluation]:
+    """
+    Helper function that obtains all evaluations of a single chunk, page by page. Each page is retried individually
+    """
+    evaluations = dict()
+    offset = 0
+    filters = _evaluation_filters(setup_ids, task_ids)
+    # the per_fold filter is only passed when requested
+    if per_fold:
+        filters['per_fold'] = True
+    while True:
+        def list_page():
+            return openml.evaluations.list_evaluations(function=measure, offset=offset, size=page_size, **filters)
+        try:
+            page = _with_retry(list_page, max_retries, backoff)
+        except openml.exceptions.OpenMLServerNoResult:
+            page = dict()
+        if profiler is not None:
+            profiler.record_api_call()
+        evaluations.update(page)
+        if len(page) < page_size:
+            return evaluations
+        offset += page_size
+
+
+def fetch_qualities(data_ids: Iterable[int], n_jobs: int=8, cache: Optional[MetadataCache]=None,
+                    profiler: Optional[Profiler]=None) -> Dict[int, Dict[str, float]]:
+    """
+    obtains the qualities (meta-features) of a set of datasets from OpenML
+
+    :param data_ids: iterable
+        the dataset ids to obtain the qualities for. Duplicates (e.g., multiple tasks on the same dataset) are only
+        fetched once
+    :param n_jobs: int
+        the maximum number of requests that are performed concurrently
+    :param cache: MetadataCache
+        if set, qualities are served from and stored in this cache
+    :param profiler: Profiler
+        if set, the API calls and cache lookups are recorded in its current phase
+    :return: dict
+        mapping from dataset id to a dict mapping from quality name to value
+    """
+    if n_jobs < 1:
+        raise ValueError('n_jobs should be at least 1, got %d' % n_jobs)
+
+    def fetch_missing(missing_data_ids):
+        if len(missing_data_ids) == 0:
+            return dict()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(n_jobs, len(missing_data_ids))) as executor:
+            results = executor.map(lambda data_id: _get_qualities(data_id, profiler), missing_data_ids)
+            return dict(zip(missing_data_ids, results))
+
+    return _cached_fetch(cache, 'qualities', sorted(set(data_ids)), '', fetch_missing, profiler)
+
+
+def fetch_evaluations(measure: str, setup_ids: Iterable[int], task_ids: Iterable[int], n_jobs: int=8,
+                      chunk_size: int=100, page_size: int=10000, max_retries: int=3,
+                      backoff: float=1.0, cache: Optional[MetadataCache]=None, profiler: Optional[Profiler]=None,
+                      per_fold: bool=False, refresh: bool=False) -> Dict[int, openml.evaluations.OpenMLEvaluation]:
+    """
+    obtains all evaluations of a given measure on the grid of setups and tasks from OpenML. The setup and task ids
+    are split into chunks (to stay below the length limits of the filter), the chunks are listed concurrently and
+    paged through, and the results are merged.
+
+    :param measure: str
+        the evaluation measure to be obtained from OpenML (e.g., predictive_accuracy, area_under_roc_curve)
+    :param setup_ids: iterable
+        the setup ids to obtain the evaluations for
+    :param task_ids: iterable
+        the task ids to obtain the evaluations for
+    :param n_jobs: int
+        the maximum number of chunks that are listed concurrently
+    :param chunk_size: int
+        the maximum number of setup ids and task ids per request
+    :param page_size: int
+        the maximum number of evaluations requested per page
+    :param max_retries: int
+        the number of times a failing page request is retried, before the whole fetch is aborted
+    :param backoff: float
+        the number of seconds waited before the first retry. This doubles for every subsequent retry
+    :param cache: MetadataCache
+        if set, evaluations are served from and stored in this cache, per (task, setup) cell. Cells without
+        evaluations are stored as well, so these are not requested again
+    :param profiler: Profiler
+        if set, the API calls and cache lookups are recorded in its current phase
+    :param per_fold: bool
+        if True, the evaluations contain the values of all folds and repetitions (in values) instead of the
+        aggregated value. These are cached separately from the aggregated evaluations
+    :param refresh: bool
+        if True, the cached evaluations are not used, but all cells are requested again (and the cache is updated).
+        Use this for cells that might have obtained new runs since they were cached
+    :return: dict
+        mapping from run id to the evaluation object
+    """
+    if n_jobs < 1:
+        raise ValueError('n_jobs should be at least 1, got %d' % n_jobs)
+    if chunk_size < 1 or page_size < 1:
+        raise ValueError('chunk_size and page_size should be at least 1')
+
+    cache_measure = measure + ('/per_fold' if per_fold else '')
+
+    def fetch_grid(grid_setup_ids, grid_task_ids, on_chunk=None):
+        chunks = list(itertools.product(_chunks(grid_setup_ids, chunk_size), _chunks(grid_task_ids, chunk_size)))
+        grid_evaluations = dict()
+        if len(chunks) == 0:
+            return grid_evaluations
+        errors = []
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(n_jobs, len(chunks))) as executor:
+            futures = {executor.submit(_get_evaluations_chunk, measure, setup_chunk, task_chunk, page_size,
+                                       max_retries, backoff, profiler, per_fold): (setup_chunk, task_chunk)
+                       for setup_chunk, task_chunk in chunks}
+            # a failing chunk does not discard the chunks that did finish, the error is raised when all are done
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    chunk_evaluations = future.result()
+                except Exception as e:
+                    errors.append(e)
+                    continue
+                if on_chunk is not None:
+                    on_chunk(*futures[future], chunk_evaluations)
+                grid_evaluations.update(chunk_evaluations)
+        if len(errors) > 0:
+            raise errors[0]
+        return grid_evaluations
+
+    if cache is None:
+        return fetch_grid(setup_ids, task_ids)
+
+    def fetch_missing(missing_cells):
+        # requests the smallest grid that covers all missing cells
+        missing_setup_ids = {setup_id for _, setup_id in missing_cells}
+        missing_task_ids = {task_id for task_id, _ in missing_cells}
+        cell_evaluations = dict()
+
+        def store_chunk(setup_chunk, task_chunk, chunk_evaluations):
+            # every chunk is stored as soon as it is obtained, so a rerun after a failure only requests the rest
+            chunk_cells = {(task_id, setup_id): [] for task_id in task_chunk for setup_id in setup_chunk}
+            for evaluation in chunk_evaluations.values():
+                chunk_cells[(evaluation.task_id, evaluation.setup_id)].append(evaluation)
+            cache.put_many('evaluations', chunk_cells, cache_measure)
+            cell_evaluations.update(chunk_cells)
+
+        fetch_grid(missing_setup_ids, missing_task_ids, store_chunk)
+        return cell_evaluations
+
+    cells = [(task_id, setup_id) for task_id in sorted(set(task_ids)) for setup_id in sorted(set(setup_ids))]
+    cell_evaluations = _cached_fetch(cache, 'evaluations', cells, cache_measure, fetch_missing, profiler, refresh,
+                                     store=False)
+    evaluations = dict()
+    for cell in cells:
+        for evaluation in cell_evaluations[cell]:
+            evaluations[evaluation.run_id] = evaluation
+    return evaluations
+
+
+def fetch_setups(setup_ids: Iterable[int], n_jobs: int=8, chunk_size: int=100, max_retries: int=3,
+                 backoff: float=1.0, cache: Optional[MetadataCache]=None,
+                 profiler: Optional[Profiler]=None) -> Dict[int, openml.setups.OpenMLSetup]:
+    """
+    obtains the setup objects (including the hyperparameter settings) of a set of setups from OpenML. The setup ids
+    are split into chunks, which are listed concurrently
+
+    :param setup_ids: iterable
+        the setup ids to obtain
+    :param n_jobs: int
+        the maximum number of chunks that are listed concurrently
+    :param chunk_size: int
+        the maximum number of setup ids per request
+    :param max_retries: int
+        the number of times a failing request is retried
+    :param backoff: float
+        the number of seconds waited before the first retry. This doubles for every subsequent retry
+    :param cache: MetadataCache
+        if set, setups are served from and stored in this cache
+    :param profiler: Profiler
+        if set, the API calls and cache lookups are recorded in its current phase
+    :return: dict
+        mapping from setup id to setup object. Setups that are not known on OpenML are omitted
+    """
+    if n_jobs < 1:
+        raise ValueError('n_jobs should be at least 1, got %d' % n_jobs)
+
+    def list_chunk(setup_chunk):
+        try:
+            setups = _with_retry(lambda: openml.setups.list_setups(setup=setup_chunk, size=len(setup_chunk)),
+                                 max_retries, backoff)
+        except openml.exceptions.OpenMLServerNoResult:
+            setups = dict()
+        if profiler is not None:
+            profiler.record_api_call()
+        return setups
+
+    def fetch_missing(missing_setup_ids):
+        chunks = _chunks(missing_setup_ids, chunk_size)
+        setups = dict()
+        if len(chunks) == 0:
+            return setups
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(n_jobs, len(chunks))) as executor:
+            for chunk_setups in executor.map(list_chunk, chunks):
+                setups.update(chunk_setups)
+        return setups
+
+    return _cached_fetch(cache, 'setups', sorted(set(setup_ids)), '', fetch_missing, profiler)
+
+
+def fetch_flows(flow_ids: Iterable[int], n_jobs: int=8, max_retries: int=3, backoff: float=1.0,
+                cache: Optional[MetadataCache]=None,
+                profiler: Optional[Profiler]=None) -> Dict[int, openml.flows.OpenMLFlow]:
+    """
+    obtains the flow objects of a set of flows from OpenML. Each distinct flow is requested once, concurrently
+
+    :param flow_ids: iterable
+        the flow ids to obtain
+    :param n_jobs: int
+        the maximum number of requests that are performed concurrently
+    :param max_retries: int
+        the number of times a failing request is retried
+    :param backoff: float
+        the number of seconds waited before the first retry. This doubles for every subsequent retry
+    :param cache: MetadataCache
+        if set, flows are served from and stored in this cache
+    :param profiler: Profiler
+        if set, the API calls and cache lookups are recorded in its current phase
+    :return: dict
+        mapping from flow id to flow object
+    """
+    if n_jobs < 1:
+        raise ValueError('n_jobs should be at least 1, got %d' % n_jobs)
+
+    def get_flow(flow_id):
+        flow = _with_retry(lambda: openml.flows.get_flow(flow_id), max_retries, backoff)
+        if profiler is not None:
+            profiler.record_api_call()
+        return flow
+
+    def fetch_missing(missing_flow_ids):
+        if len(missing_flow_ids) == 0:
+            return dict()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(n_jobs, len(missing_flow_ids))) as executor:
+            return dict(zip(missing_flow_ids, executor.map(get_flow, missing_flow_ids)))
+
+    return _cached_fetch(cache, 'flows', sorted(set(flow_ids)), '', fetch_missing, profiler)
+
+
+def fetch_evaluation_cells(measure: str, cells: Iterable[Tuple[int, int]], n_jobs: int=8,
+                           **kwargs) -> Dict[int, openml.evaluations.OpenMLEvaluation]:
+    """
+    obtains all evaluations of a given measure on a (sparse) set of (task id, setup id) cells from OpenML. Setups
+    that miss the same set of tasks are requested together, using fetch_evaluations. These groups are requested
+    concurrently, sharing a single pool of n_jobs workers
+
+    :param measure: str
+        the evaluation measure to be obtained from OpenML (e.g., predictive_accuracy, area_under_roc_curve)
+    :param cells: iterable
+        the (task id, setup id) tuples to obtain the evaluations for
+    :param n_jobs: int
+        the maximum number of requests that are performed concurrently
+    :param kwargs:
+        passed to fetch_evaluations
+    :return: dict
+        mapping from run id to the evaluation object
+    """
+    if n_jobs < 1:
+        raise ValueError('n_jobs should be at least 1, got %d' % n_jobs)
+    setup_tasks = collections.defaultdict(set)
+    for task_id, setup_id in cells:
+        setup_tasks[setup_id].add(task_id)
+    tasks_setups = collections.defaultdict(list)
+    for setup_id, task_ids in setup_tasks.items():
+        tasks_setups[frozenset(task_ids)].append(setup_id)
+
+    evaluations = dict()
+    if len(tasks_setups) == 0:
+        return evaluations
+    # the groups share the pool, so the chunks of every group are listed one after the other
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(n_jobs, len(tasks_setups))) as executor:
+        futures = [executor.submit(fetch_evaluations, measure, setup_ids, task_ids, n_jobs=1, **kwargs)
+                   for task_ids, setup_ids in tasks_setups.items()]
+        for future in concurrent.futures.as_completed(futures):
+            evaluations.update(future.result())
+    return evaluations
@@ -0,0 +1,98 @@
+import arff
+import collections
+import json
+import os
+import yaml
+
+from .matrix import PerformanceMatrix
+from typing import Dict, List, Set, Tuple
+
+
+# the results of an earlier generation of a scenario, as read back from its directory
+PreviousScenario = collections.namedtuple('PreviousScenario', ['cells', 'task_data_id', 'task_setup_result',
+                                                               'data_qualities', 'algos', 'algorithm_setups'])
+
+
+def write_manifest(directory: str, measure: str, cells: Set[Tuple[int, int, str]], performance: PerformanceMatrix,
+                   task_data_id: Dict[int, int], algorithm_setups: Dict[str, List[int]],
+                   data_qualities: Dict[int, Dict[str, float]]):
+    """
+    stores a manifest of what was fetched from OpenML next to the scenario, so that it can be regenerated incrementally.
+    Cells are stored as (task id, setup id) pairs with their value, their setup names follow from algorithm_setups. All
+    obtained cells are stored, also those that were pruned from the scenario. The qualities are stored as obtained
+    (feature_values.arff only contains the ones that were used as feature on these tasks)
+
+    :param directory: str
+        the directory of the scenario
+    :param measure: str
+        the evaluation measure of the scenario
+    :param cells: set
+        (task id, setup id, setup name) tuples of all cells for which an evaluation was obtained
+    :param performance: PerformanceMatrix
+        the performance matrix before pruning, with the value of each cell
+    :param task_data_id: dict
+        mapping from task id to dataset id
+    :param algorithm_setups: dict
+        mapping from setup name to its setup ids, for all setup names of the cells
+    :param data_qualities: dict
+        mapping from dataset id to all its qualities
+    """
+    cells = sorted(cells)
+    manifest = {'measure': measure,
+                'cells': [(task_id, setup_id) for task_id, setup_id, _ in cells],
+                'values': [performance.get(task_id, setup_name) for task_id, _, setup_name in cells],
+                'task_data_id': {str(task_id): data_id for task_id, data_id in task_data_id.items()},
+                'algorithm_setups': {name: sorted(setup_ids) for name, setup_ids in algorithm_setups.items()},
+                'data_qualities': {str(data_id): dict(sorted(data_qualities[data_id].items()))
+                                   for data_id in sorted(data_qualities)}}
+    # encoded at once (json.dump writes every token separately, which is slow on large grids)
+    manifest_string = json.dumps(manifest)
+    with open(os.path.join(directory, 'manifest.json'), 'w') as fp:
+        fp.write(manifest_string)
+
+
+def load_previous_scenario(directory: str, measure: str) -> PreviousScenario:
+    """
+    reads back a scenario that was generated earlier, together with its manifest
+
+    :param directory: str
+        the directory of the scenario
+    :param measure: str
+        the evaluation measure of the scenario that will be generated. Should match the measure of the earlier one
+    :return: PreviousScenario
+        the earlier obtained results
+    """
+    with open(os.path.join(directory, 'manifest.json'), 'r') as fp:
+        manifest = json.load(fp)
+    if manifest['measure'] != measure:
+        raise ValueError('Can not regenerate scenario incrementally, it was generated for measure %s (requested %s)'
+                         % (manifest['measure'], measure))
+
+    setupid_setupname = {setup_id: name for name, setup_ids in manifest['algorithm_setups'].items()
+                         for setup_id in setup_ids}
+    # manifests of earlier versions also contain the setup name of each cell
+    cells = [(cell[0], cell[1], setupid_setupname[cell[1]]) for cell in manifest['cells']]
+
+    task_setup_result = collections.defaultdict(dict)
+    if 'values' in manifest:
+        for (task_id, _, setup_name), value in zip(cells, manifest['values']):
+            task_setup_result[task_id][setup_name] = value
+    else:
+        # manifests of earlier versions have no values, these are read from the scenario
+        with open(os.path.join(directory, 'algorithm_runs.arff'), 'r') as fp:
+            for task_id, _, setup_name, perf, status in arff.load(fp)['data']:
+                if status == 'ok':
+                    task_setup_result[int(task_id)][setup_name] = perf
+
+    with open(os.path.join(directory, 'description.txt'), 'r') as fp:
+        description = yaml.safe_load(fp)
+
+    return PreviousScenario(cells=set(cells),
+                            task_data_id={int(task_id): data_id
+                                          for task_id, data_id in manifest['task_data_id'].items()},
+                            task_setup_result=dict(task_setup_result),
+                            # manifests of earlier versions do not contain the qualities, these are obtained again
+                            data_qualities={int(data_id): qualities
+                                            for data_id, qualities in manifest.get('data_qualities', {}).items()},
+                            algos=description['algorithms_deterministic'],
+                            algorithm_setups=manifest['algorithm_setups'])
@@ -0,0 +1,89 @@
+import numpy as np
+
+from typing import Iterable, List, Optional, Tuple
+
+
+class PerformanceMatrix(object):
+    """
+    dense performance matrix of a scenario. Stores a value for each (task, algorithm) cell, together with a mask that
+    indicates which cells were actually observed. Rows are tasks, columns are algorithms (setup names).
+
+    :param task_ids: iterable
+        the task ids (rows), in the order in which they will be written
+    :param algorithms: iterable
+        the algorithm names (columns), in the order in which they will be written
+    """
+
+    def __init__(self, task_ids: Iterable[int], algorithms: Iterable[str]):
+        # duplicates are removed, but the order is retained
+        self.task_ids = list(dict.fromkeys(task_ids))
+        self.algorithms = list(dict.fromkeys(algorithms))
+        self.task_index = {task_id: idx for idx, task_id in enumerate(self.task_ids)}
+        self.algorithm_index = {algorithm: idx for idx, algorithm in enumerate(self.algorithms)}
+        self.values = np.zeros((len(self.task_ids), len(self.algorithms)), dtype=np.float64)
+        self.observed = np.zeros((len(self.task_ids), len(self.algorithms)), dtype=bool)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.values.shape
+
+    def set(self, task_id: int, algorithm: str, value: float):
+        row, column = self.task_index[task_id], self.algorithm_index[algorithm]
+        self.values[row, column] = value
+        self.observed[row, column] = True
+
+    def get(self, task_id: int, algorithm: str) -> Optional[float]:
+        """
+        :return: the value of a cell, or None if it was not observed
+        """
+        row, column = self.task_index[task_id], self.algorithm_index[algorithm]
+        if not self.observed[row, column]:
+            return None
+        return float(self.values[row, column])
+
+    def observed_task_ids(self) -> List[int]:
+        """
+        :return: the task ids with at least one observed cell
+        """
+        return [self.task_ids[idx] for idx in np.flatnonzero(self.observed.any(axis=1))]
+
+    def observed_algorithms(self) -> List[str]:
+        """
+        :return: the algorithms with at least one observed cell
+        """
+        return [self.algorithms[idx] for idx in np.flatnonzero(self.observed.any(axis=0))]
+
+    def missing_cells(self) -> List[Tuple[int, str]]:
+        """
+        :return: the (task id, algorithm) tuples of all cells that were not observed
+        """
+        return [(self.task_ids[row], self.algorithms[column]) for row, column in np.argwhere(~self.observed)]
+
+    def subset(self, task_ids: Optional[Iterable[int]]=None,
+               algorithms: Optional[Iterable[str]]=None) -> 'PerformanceMatrix':
+        """
+        :return: a new performance matrix containing only the given tasks and algorithms (default: all of them)
+        """
+        task_ids = self.task_ids if task_ids is None else task_ids
+        algorithms = self.algorithms if algorithms is None else algorithms
+        result = PerformanceMatrix(task_ids, algorithms)
+        rows = [self.task_index[task_id] for task_id in result.task_ids]
+        columns = [self.algorithm_index[algorithm] for algorithm in result.algorithms]
+        result.values = self.values[np.ix_(rows, columns)]
+        result.observed = self.observed[np.ix_(rows, columns)]
+        return result
+
+    def run_rows(self, fill_value=0):
+        """
+        generates the rows of algorithm_runs.arff, one at a time. Cells that were not observed get status other and the
+        fill value as performance
+
+        :param fill_value:
+            the performance that is recorded for cells that were not observed
+        """
+        for task_id, values, observed in zip(self.task_ids, self.values.tolist(), self.observed.tolist()):
+            for algorithm, value, is_observed in zip(self.algorithms, values, observed):
+                if is_observed:
+                    yield [task_id, '1', algorithm, value, 'ok']
+                else:
+                    yield [task_id, '1', algorithm, fill_value, 'other']
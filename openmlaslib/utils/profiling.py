@@ -0,0 +1,120 @@
+import collections
+import contextlib
+import json
+import threading
+import time
+import tracemalloc
+
+from typing import Any, Callable, Dict, Optional
+
+
+class Profiler(object):
+    """
+    records metrics of the phases of scenario generation: wall time, number of API calls, bytes received (of the calls
+    of which the size of the response is known, None if it is known for none of them), cache hits and misses, and
+    (optionally) peak memory. Fetch functions record their API calls and cache lookups in the phase that is currently
+    active.
+
+    :param callback: callable
+        if set, this is called at the end of every phase with the phase name and its metrics (e.g., to forward
+        these to a monitoring system)
+    :param trace_memory: bool
+        if True, the peak memory that is allocated during each phase is traced (using tracemalloc). This slows down
+        the execution considerably
+    """
+
+    def __init__(self, callback: Optional[Callable[[str, Dict[str, Any]], None]]=None, trace_memory: bool=True):
+        self.callback = callback
+        self.trace_memory = trace_memory
+        self.phases = collections.OrderedDict()
+        self._current = None
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        """
+        context manager that records the metrics of everything that happens inside it under the given phase name
+        """
+        metrics = self.phases.setdefault(name, {'wall_time': 0.0, 'api_calls': 0, 'bytes_received': None,
+                                                'cache_hits': 0, 'cache_misses': 0, 'peak_memory_mb': None})
+        previous = self._current
+        self._current = metrics
+        started_tracing = False
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            elif hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield metrics
+        finally:
+            metrics['wall_time'] += time.perf_counter() - start
+            if self.trace_memory:
+                peak_memory = tracemalloc.get_traced_memory()[1] / 2 ** 20
+                metrics['peak_memory_mb'] = max(metrics['peak_memory_mb'] or 0.0, peak_memory)
+                if started_tracing:
+                    tracemalloc.stop()
+            self._current = previous
+            if self.callback is not None:
+                self.callback(name, dict(metrics))
+
+    def record_api_call(self, num_bytes: Optional[int]=None):
+        """
+        records an API call in the current phase
+
+        :param num_bytes: int
+            the size of the received payload, if known (e.g., when the raw response is available). Calls through the
+            openml package only return parsed objects, their size is unknown
+        """
+        with self._lock:
+            if self._current is not None:
+                self._current['api_calls'] += 1
+                if num_bytes is not None:
+                    self._current['bytes_received'] = (self._current['bytes_received'] or 0) + num_bytes
+
+    def record_cache_lookup(self, hits: int, misses: int):
+        """
+        records the outcome of cache lookups in the current phase
+        """
+        with self._lock:
+            if self._current is not None:
+                self._current['cache_hits'] += hits
+                self._current['cache_misses'] += misses
+
+    def merge(self, metrics: Dict[str, Any]):
+        """
+        adds the API calls, bytes received and cache lookups of metrics that were recorded elsewhere (e.g., by the
+        profiler of a worker process) to the current phase
+
+        :param metrics: dict
+            the metrics of a phase of another profiler
+        """
+        with self._lock:
+            if self._current is not None:
+                for key in ['api_calls', 'cache_hits', 'cache_misses']:
+                    self._current[key] += metrics[key]
+                if metrics['bytes_received'] is not None:
+                    self._current['bytes_received'] = (self._current['bytes_received'] or 0) + \
+                        metrics['bytes_received']
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        :return: dict
+            the metrics of all phases (in order of execution) and the totals
+        """
+        totals = {key: sum(metrics[key] for metrics in self.phases.values())
+                  for key in ['wall_time', 'api_calls', 'cache_hits', 'cache_misses']}
+        # only the phases in which the size of a response was known are counted
+        known_bytes = [metrics['bytes_received'] for metrics in self.phases.values()
+                       if metrics['bytes_received'] is not None]
+        totals['bytes_received'] = sum(known_bytes) if len(known_bytes) > 0 else None
+        return {'phases': self.phases, 'total': totals}
+
+    def write(self, path: str):
+        """
+        stores the metrics as json
+        """
+        with open(path, 'w') as fp:
+            json.dump(self.to_dict(), fp, indent=2)
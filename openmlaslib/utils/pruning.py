@@ -0,0 +1,134 @@
+import collections
+import numpy as np
+
+from .matrix import PerformanceMatrix
+from typing import Tuple
+
+
+# outcome of the subgrid selection: the kept and dropped task ids and algorithms, the method that was used (exact or
+# greedy) and the fraction of observed cells in the kept subgrid
+SubgridSelection = collections.namedtuple('SubgridSelection', ['task_ids', 'algorithms', 'dropped_task_ids',
+                                                               'dropped_algorithms', 'method', 'coverage'])
+
+
+def _exact_selection(observed: np.ndarray, min_coverage: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Helper function that finds the largest subgrid (in number of cells) with at least min_coverage observed cells, by
+    enumerating all subsets of columns. For a given subset of columns, the best rows are the ones with the most
+    observed cells on these columns, so only the number of rows needs to be determined
+
+    :return: tuple
+        boolean masks of the selected rows and columns
+    """
+    num_rows, num_columns = observed.shape
+    counts_per_column = observed.astype(np.int64)
+    num_rows_range = np.arange(1, num_rows + 1)[:, np.newaxis]
+    # subsets are evaluated in batches, limiting the memory to a few million counts
+    batch_size = max(1, 2 ** 22 // num_rows)
+    best_area, best_subset, best_num_rows = 0, 0, 0
+    for start in range(1, 2 ** num_columns, batch_size):
+        subsets = np.arange(start, min(start + batch_size, 2 ** num_columns))
+        # a row per subset, indicating the columns in it
+        members = (subsets[:, np.newaxis] >> np.arange(num_columns)) & 1
+        subset_sizes = members.sum(axis=1)
+        # number of observed cells of each row on each subset, sorted from high to low
+        counts = -np.sort(-(counts_per_column @ members.T), axis=0)
+        # the average of a prefix decreases with its length, so the valid numbers of rows form a prefix
+        valid = (np.cumsum(counts, axis=0) >= min_coverage * num_rows_range * subset_sizes - 1e-9) & (counts > 0)
+        num_selected_rows = np.minimum.accumulate(valid, axis=0).sum(axis=0)
+        areas = num_selected_rows * subset_sizes
+        best = int(np.argmax(areas))
+        if areas[best] > best_area:
+            best_area, best_subset, best_num_rows = int(areas[best]), int(subsets[best]), int(num_selected_rows[best])
+
+    columns = ((best_subset >> np.arange(num_columns)) & 1).astype(bool)
+    rows = np.zeros(num_rows, dtype=bool)
+    rows[np.argsort(-observed[:, columns].sum(axis=1), kind='stable')[:best_num_rows]] = True
+    return rows, columns
+
+
+def _greedy_selection(observed: np.ndarray, min_coverage: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Helper function that repeatedly drops the row or column with the highest fraction of missing cells, until the
+    remaining subgrid has at least min_coverage observed cells
+
+    :return: tuple
+        boolean masks of the selected rows and columns
+    """
+    missing = ~observed
+    rows = np.ones(observed.shape[0], dtype=bool)
+    columns = np.ones(observed.shape[1], dtype=bool)
+    # number of missing cells of each row and column within the remaining subgrid
+    row_missing = missing.sum(axis=1).astype(np.int64)
+    column_missing = missing.sum(axis=0).astype(np.int64)
+    total_missing = int(row_missing.sum())
+    while rows.any() and columns.any():
+        num_rows, num_columns = int(rows.sum()), int(columns.sum())
+        if total_missing <= (1 - min_coverage) * num_rows * num_columns + 1e-9:
+            break
+        row_fraction = np.where(rows, row_missing / num_columns, -1)
+        column_fraction = np.where(columns, column_missing / num_rows, -1)
+        row, column = int(np.argmax(row_fraction)), int(np.argmax(column_fraction))
+        if row_fraction[row] >= column_fraction[column]:
+            rows[row] = False
+            total_missing -= int(row_missing[row])
+            column_missing -= missing[row] & columns
+        else:
+            columns[column] = False
+            total_missing -= int(column_missing[column])
+            row_missing -= missing[:, column] & rows
+    return rows, columns
+
+
+def select_complete_subgrid(performance: PerformanceMatrix, min_coverage: float=1.0,
+                            exact_limit: int=12) -> SubgridSelection:
+    """
+    selects a large subgrid of tasks and algorithms of which (at least a fraction min_coverage of) all cells are
+    observed. When the tasks or the algorithms are few, the subgrid with the most cells is found exactly (by
+    enumerating all subsets of the smaller dimension), otherwise the rows and columns with the most missing cells are
+    dropped one by one
+
+    :param performance: PerformanceMatrix
+        the performance matrix, of which the observed mask is used
+    :param min_coverage: float
+        the minimal fraction of observed cells in the subgrid (1.0 means that the subgrid is complete)
+    :param exact_limit: int
+        the maximal number of tasks or algorithms (whichever is lower) for which the exact method is used
+    :return: SubgridSelection
+        the kept and dropped task ids and algorithms (in their original order), the method and the coverage
+    """
+    if not 0 < min_coverage <= 1:
+        raise ValueError('min_coverage should be in (0, 1], got %s' % min_coverage)
+    observed = performance.observed
+    transposed = observed.shape[0] < observed.shape[1]
+    if transposed:
+        observed = observed.T
+
+    if min(observed.shape) == 0:
+        method, (rows, columns) = 'exact', (np.zeros(observed.shape[0], dtype=bool),
+                                            np.zeros(observed.shape[1], dtype=bool))
+    elif observed.shape[1] <= exact_limit:
+        method, (rows, columns) = 'exact', _exact_selection(observed, min_coverage)
+    else:
+        method, (rows, columns) = 'greedy', _greedy_selection(observed, min_coverage)
+    # rows and columns without any observed cell are never useful (dropping these only increases the coverage)
+    while rows.any() and columns.any():
+        empty_rows = rows & ~observed[:, columns].any(axis=1)
+        empty_columns = columns & ~observed[rows].any(axis=0)
+        if not empty_rows.any() and not empty_columns.any():
+            break
+        rows &= ~empty_rows
+        columns &= ~empty_columns
+    if transposed:
+        rows, columns = columns, rows
+
+    if not rows.any() or not columns.any():
+        raise ValueError('No subgrid with a coverage of at least %s could be found' % min_coverage)
+    coverage = float(performance.observed[np.ix_(rows, columns)].mean())
+    return SubgridSelection(task_ids=[task_id for task_id, keep in zip(performance.task_ids, rows) if keep],
+                            algorithms=[algorithm for algorithm, keep in zip(performance.algorithms, columns) if keep],
+                            dropped_task_ids=[task_id for task_id, keep in zip(performance.task_ids, rows)
+                                              if not keep],
+                            dropped_algorithms=[algorithm for algorithm, keep in zip(performance.algorithms, columns)
+                                                if not keep],
+                            method=method, coverage=coverage)
@@ -0,0 +1,129 @@
+import collections
+import concurrent.futures
+import json
+import logging
+import openml
+import os
+
+from typing import Any, Dict, List, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+def _run_model_on_task(model: Any, task_id: int) -> Tuple[int, int]:
+    """
+    Helper function that runs a model on a task, publishes it on OpenML and obtains its setup id. Executed in a worker
+    process
+
+    :return: tuple
+        the run id and setup id
+    """
+    # download all task specific information (will be cached for later use)
+    task = openml.tasks.get_task(task_id)
+    try:
+        # run the model on the task
+        run = openml.runs.run_model_on_task(task, model, avoid_duplicate_runs=True)
+        # publish the run on OpenML
+        run_id = run.publish().run_id
+    except openml.exceptions.PyOpenMLError as e:
+        # apparently someone already executed this run. No problem, we can re-use their results
+        if not e.message.startswith('Run already exists in server.'):
+            raise
+        run_ids = e.message.split('{')[1].split('}')[0].split(',')
+        run_id = int(run_ids[0])
+
+    # obtain the stored run object from the server. This is how we will acquire the setup id
+    # (which uniquely identifies this model / hyperparameter combination)
+    run = openml.runs.get_run(run_id)
+    return run_id, run.setup_id
+
+
+def _load_checkpoint(checkpoint_file: str) -> List[Dict[str, Any]]:
+    """
+    Helper function that reads the results that were finished earlier (one json record per line). A partially written
+    last line (left by a crash) is removed from the file, so that new records can be appended
+    """
+    if not os.path.isfile(checkpoint_file):
+        return []
+    records = []
+    complete_size = 0
+    with open(checkpoint_file, 'rb') as fp:
+        for line in fp:
+            if not line.endswith(b'\n'):
+                break
+            complete_size += len(line)
+            if line.strip():
+                records.append(json.loads(line.decode('utf-8')))
+    if complete_size < os.path.getsize(checkpoint_file):
+        os.truncate(checkpoint_file, complete_size)
+    return records
+
+
+def run_models_on_tasks(models: Dict[str, Any], task_ids: List[int], checkpoint_file: str,
+                        n_jobs: int=1) -> Dict[int, str]:
+    """
+    runs a set of models on all tasks (e.g., of an OpenML benchmark suite), publishes the results on OpenML and
+    returns the setup id of each model (for later use in OpenML ASLib). The (model, task) combinations are spread over a
+    pool of processes. Every finished combination is recorded in a checkpoint file, so that a crashed or interrupted
+    execution continues where it stopped when called again with the same checkpoint file.
+
+    :param models: dict
+        mapping from name to a model compatible with the sklearn API (e.g., a pipeline). The hyperparameters (including
+        the random seed) should be fixed, so that each model has the same setup id on all tasks
+    :param task_ids: list
+        the task ids to run the models on
+    :param checkpoint_file: str
+        location of the checkpoint file
+    :param n_jobs: int
+        the number of worker processes
+    :return: dict
+        mapping from setup id to model name (the setupid_setupname argument of generate_scenario)
+    """
+    if n_jobs < 1:
+        raise ValueError('n_jobs should be at least 1, got %d' % n_jobs)
+    if os.path.dirname(checkpoint_file):
+        os.makedirs(os.path.dirname(checkpoint_file), exist_ok=True)
+
+    name_setupids = collections.defaultdict(set)
+    finished = set()
+    for record in _load_checkpoint(checkpoint_file):
+        name_setupids[record['name']].add(record['setup_id'])
+        finished.add((record['name'], record['task_id']))
+    todo = [(name, task_id) for name in models for task_id in task_ids if (name, task_id) not in finished]
+
+    if len(todo) > 0:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=min(n_jobs, len(todo))) as executor, \
+                open(checkpoint_file, 'a') as fp:
+            futures = {executor.submit(_run_model_on_task, models[name], task_id): (name, task_id)
+                       for name, task_id in todo}
+            failed = []
+            for future in concurrent.futures.as_completed(futures):
+                name, task_id = futures[future]
+                try:
+                    run_id, setup_id = future.result()
+                except Exception as e:
+                    # the other combinations are still finished (and checkpointed) before raising
+                    logger.warning('Running %s on task %d failed: %s' % (name, task_id, e))
+                    failed.append((name, task_id))
+                    continue
+                logger.info('Ran %s on task %d (run id %d, setup id %d)' % (name, task_id, run_id, setup_id))
+                record = {'name': name, 'task_id': task_id, 'run_id': run_id, 'setup_id': setup_id}
+                fp.write(json.dumps(record) + '\n')
+                fp.flush()
+                name_setupids[name].add(setup_id)
+        if len(failed) > 0:
+            raise ValueError('Running failed on %d combinations, e.g., %s on task %d. Call again with the same '
+                             'checkpoint file to retry these' % (len(failed), failed[0][0], failed[0][1]))
+
+    setupid_setupname = dict()
+    for name in models:
+        # sanity check
+        if len(name_setupids[name]) != 1:
+            # if the setup id doesn't match, this means at least one of the hyperparameters
+            # has changed across the tasks.
+            # most likely candidates are the random seed or an indicator for categorical features,
+            # if using a OneHotEncoder
+            raise ValueError('Setup ids do not match for %s: %s' % (name, sorted(name_setupids[name])))
+        setupid_setupname[name_setupids[name].pop()] = name
+    return setupid_setupname
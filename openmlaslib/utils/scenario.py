@@ -1,19 +1,166 @@
-import arff
 import collections
-import openml
+import json
+import numpy as np
 import os
+import shutil
 import yaml
 
-from typing import Dict, List, Set
+from .aggregation import RunningStatistics
+from .arff_writer import dump_streaming
+from .baselines import Baselines, is_maximized
+from .async_fetch import AsyncOpenMLClient, fetch_evaluations_async, fetch_flows_async, fetch_qualities_async, \
+    fetch_setups_async
+from .cache import MetadataCache
+from .features import FeatureMatrix, build_feature_matrix, feature_rows, feature_runstatus_rows
+from .fetch import _chunks, fetch_evaluation_cells, fetch_evaluations, fetch_flows, fetch_qualities, fetch_setups
+from .manifest import load_previous_scenario, write_manifest
+from .matrix import PerformanceMatrix
+from .profiling import Profiler
+from .pruning import select_complete_subgrid
+from .sidecar import RUNSTATUS, SIDECAR_DIR, write_scenario_arrays
+from typing import Any, Dict, List, Optional
 
 
-def _obtained_data_to_run_arff(obtained_tasks: Set[int],
-                               obtained_partialsetups: Set[str],
-                               task_setup_result: Dict[int, Dict[str, float]],
-                               measure: str, require_complete: bool):
+# specification of a scenario in a batch: the measure, the task ids, the mapping from setup id to setup name (see
+# generate_scenario), and the name of the scenario
+ScenarioSpec = collections.namedtuple('ScenarioSpec', ['measure', 'tasks', 'setupid_setupname', 'name'])
+
+
+def _check_obtained_data(performance: PerformanceMatrix, require_complete: bool):
+    """
+    Helper function that checks whether the obtained data can be turned into algorithm_runs.arff (before anything is
+    written)
+    """
+    if require_complete and not performance.observed.all():
+        # only the first missing cell is needed for the message
+        row, column = np.argwhere(~performance.observed)[0]
+        raise Warning('Not all setups were ran on all tasks. ' +
+                      'Several missing, e.g., task %d setup %s' % (performance.task_ids[row],
+                                                                   performance.algorithms[column]))
+    empty_tasks = np.flatnonzero(~performance.observed.any(axis=1))
+    if len(empty_tasks) > 0:
+        raise ValueError('There were zero completed results on task %d, consider removing it ' %
+                         performance.task_ids[empty_tasks[0]])
+
+
+def _setups_to_configuration(setups: List) -> str:
     """
-    Helper function that turns the obtained data into an dict for algorithm_runs.arff
+    Helper function that describes the hyperparameter settings that all given setups (of the same algorithm) have
+    in common, e.g., 'weka.J48(1)_C=0.25, weka.J48(1)_M=2'. Hyperparameters that differ (e.g., the random seed) are
+    left out
     """
+    common = None
+    for setup in setups:
+        parameters = {parameter.full_name: parameter.value for parameter in (setup.parameters or {}).values()}
+        if common is None:
+            common = parameters
+        else:
+            common = {name: value for name, value in common.items() if parameters.get(name) == value}
+    return ', '.join('%s=%s' % (name, value) for name, value in sorted((common or {}).items()))
+
+
+def _check_obtained_grid(performance: PerformanceMatrix, tasks: List[int], setupid_setupname: Dict[int, str]):
+    """
+    Helper function that checks whether all tasks and setups have at least one result
+    """
+    obtained_tasks = performance.observed_task_ids()
+    obtained_partialsetups = performance.observed_algorithms()
+    # this means there were zero results on this task. Throw error so user can throw it out.
+    if len(obtained_tasks) != len(performance.task_ids):
+        raise Warning('Tasks not found in evaluation list: %s' % (set(tasks) - set(obtained_tasks)))
+    # this means there were zero results on this partialsetup. Throw error so user can throw it out.
+    if len(obtained_partialsetups) != len(performance.algorithms):
+        missing = set(setupid_setupname.values()) - set(obtained_partialsetups)
+        raise Warning('Setups not found in evaluation list: %s' % missing)
+
+
+def _prune_grid(total_dir: str, performance: PerformanceMatrix, min_coverage: float) -> PerformanceMatrix:
+    """
+    Helper function that reduces the performance matrix to a (nearly) complete subgrid and reports what was dropped
+    in pruning.json. The given performance matrix is left as is (the manifest holds all obtained cells)
+
+    :return: PerformanceMatrix
+        the performance matrix of the subgrid
+    """
+    selection = select_complete_subgrid(performance, min_coverage=min_coverage)
+    report = {'method': selection.method,
+              'min_coverage': min_coverage,
+              'coverage_before': float(performance.observed.mean()) if performance.observed.size > 0 else 0.0,
+              'coverage_after': selection.coverage,
+              'shape_before': list(performance.shape),
+              'shape_after': [len(selection.task_ids), len(selection.algorithms)],
+              'dropped_tasks': selection.dropped_task_ids,
+              'dropped_algorithms': selection.dropped_algorithms}
+    with open(os.path.join(total_dir, 'pruning.json'), 'w') as fp:
+        json.dump(report, fp, indent=2)
+
+    return performance.subset(selection.task_ids, selection.algorithms)
+
+
+def _setups_to_flow_ids(setup_names: List[str], setupname_setupid: Dict[str, List[int]],
+                        setups: Dict[int, Any]) -> Dict[str, int]:
+    """
+    Helper function that checks whether all setups of each setup name were obtained and generated by the same flow
+
+    :return: dict
+        mapping from setup name to flow id
+    """
+    setupname_flowid = dict()
+    for setup_name in setup_names:
+        missing = set(setupname_setupid[setup_name]) - set(setups.keys())
+        if len(missing) > 0:
+            raise ValueError('Did not retrieve the following setups: %s' % missing)
+
+        # check if all setups are from the same flow
+        flow_ids = {setups[setup_id].flow_id for setup_id in setupname_setupid[setup_name]}
+        if len(flow_ids) != 1:
+            raise ValueError('Not all setups are generated by same flow for %s' % setup_name)
+        setupname_flowid[setup_name] = flow_ids.pop()
+    return setupname_flowid
+
+
+def _algorithms_description(setup_names: List[str], setupname_setupid: Dict[str, List[int]], setups: Dict[int, Any],
+                            setupname_flowid: Dict[str, int], flows: Dict[int, Any]) -> Dict[str, Dict]:
+    """
+    Helper function that describes the algorithms (for the description file)
+    """
+    algos = dict()
+    for setup_name in setup_names:
+        configuration = _setups_to_configuration([setups[setup_id] for setup_id in setupname_setupid[setup_name]])
+        algos[setup_name] = {'desterministic': True,
+                             'version': flows[setupname_flowid[setup_name]].version,
+                             'configuration': configuration}
+    return algos
+
+
+def _write_scenario(total_dir: str, scenario_name: str, measure: str, performance: PerformanceMatrix,
+                    features: FeatureMatrix, algos: Dict[str, Dict], require_complete: bool, binary: bool,
+                    statistics: Optional[RunningStatistics]=None):
+    """
+    Helper function that writes all files of a scenario (the ARFF files, the description and optionally the binary
+    copy, an earlier binary copy is removed otherwise). When the statistics of the fold values are given,
+    algorithm_runs.arff has a row per repetition and the statistics are written to performance_statistics.arff. The
+    baselines are written to baselines.json
+    """
+    maximize = is_maximized(measure)
+    description = {'scenario_id': 'OpenML_' + scenario_name,
+                   'performance_measures': [measure],
+                   'maximize': [maximize],
+                   'performance_type': [measure],
+                   'algorithm_cutoff_time': 0,
+                   'algorithm_cutoff_memory': '?',
+                   'features_cutoff_time': '?',
+                   'features_cutoff_memory': '?',
+                   'algorithms_deterministic': algos,
+                   'algorithms_stochastic': '',
+                   'features_deterministic': features.feature_names,
+                   'features_stochastic': '',
+                   'number_of_feature_steps': len(features.steps),
+                   'feature_steps': {step: {'provides': provides} for step, provides in features.steps.items()},
+                   'default_steps': list(features.steps.keys())}
+
+    # all rows are written as they are produced, so the output never needs to be in memory at once
+    _check_obtained_data(performance, require_complete)
     run_attributes = [
         ['instance_id', 'STRING'],
         ['repetition', 'NUMERIC'],
@@ -21,36 +168,59 @@ def _obtained_data_to_run_arff(obtained_tasks: Set[int],
         [measure, 'NUMERIC'],
         ['runstatus', ['ok', 'timeout', 'memout', 'not_applicable', 'crash', 'other']]
     ]
+    # runs that were not observed have a missing value ('?'), which is valid for both maximized and minimized measures
+    if statistics is None:
+        run_rows = performance.run_rows(fill_value=None)
+    else:
+        run_rows = statistics.run_rows(performance.task_ids, performance.algorithms, fill_value=None)
+    with open(os.path.join(total_dir, 'algorithm_runs.arff'), 'w') as fp:
+        dump_streaming('ALGORITHM_RUNS', run_attributes, run_rows, fp)
 
-    run_data = []
-    for task_id in obtained_tasks:
-        completed_results_task = 0
-        for setup_name in obtained_partialsetups:
-            if setup_name in task_setup_result[task_id]:
-                perf = task_setup_result[task_id][setup_name]
-                status = 'ok'
-                completed_results_task += 1
-            elif require_complete:
-                raise Warning('Not all setups were ran on all tasks. ' +
-                              'Several missing, e.g., task %d setup %s' % (task_id, setup_name))
-            else:
-                perf = 0  # TODO: also allow for measures that are meant to be minimized
-                status = 'other'
-            run_data.append([task_id, '1', setup_name, perf, status])
+    if statistics is not None:
+        statistics_attributes = [['instance_id', 'STRING'],
+                                 ['algorithm', 'STRING'],
+                                 ['mean', 'NUMERIC'],
+                                 ['std', 'NUMERIC'],
+                                 ['count', 'NUMERIC']]
+        with open(os.path.join(total_dir, 'performance_statistics.arff'), 'w') as fp:
+            dump_streaming('PERFORMANCE_STATISTICS', statistics_attributes,
+                           statistics.statistics_rows(performance.task_ids, performance.algorithms), fp)
+
+    qualities_attributes = [['instance_id', 'STRING'],
+                            ['repetition', 'NUMERIC']]
+    for f in features.feature_names:
+        qualities_attributes.append([f, 'NUMERIC'])
+    with open(os.path.join(total_dir, 'feature_values.arff'), 'w') as fp:
+        dump_streaming('FEATURES', qualities_attributes, feature_rows(features), fp)
 
-        if completed_results_task == 0:
-            raise ValueError('There were zero completed results on task %d, consider removing it ' % task_id)
+    qualitystatus_attributes = [['instance_id', 'STRING'],
+                                ['repetition', 'NUMERIC']]
+    for step in features.steps:
+        qualitystatus_attributes.append([step, ['ok', 'timeout', 'memout', 'not_applicable', 'crash', 'other']])
+    with open(os.path.join(total_dir, 'feature_runstatus.arff'), 'w') as fp:
+        dump_streaming('FEATURES_RUNSTATUS', qualitystatus_attributes, feature_runstatus_rows(features), fp)
+
+    if binary:
+        # like feature_runstatus.arff, a step has status ok on a task when at least one of its features is known
+        feature_runstatus = np.where(features.step_observed, RUNSTATUS.index('ok'),
+                                     RUNSTATUS.index('other')).astype(np.int8)
+        write_scenario_arrays(total_dir, measure, performance, features.feature_names, features.values,
+                              feature_runstatus, features.steps)
+    elif os.path.isdir(os.path.join(total_dir, SIDECAR_DIR)):
+        # a binary copy of an earlier generation no longer matches the scenario (and would be preferred by readers)
+        shutil.rmtree(os.path.join(total_dir, SIDECAR_DIR))
 
-    run_arff = {
-        'attributes': run_attributes,
-        'data': run_data,
-        'relation': 'ALGORITHM_RUNS'
-    }
-    return run_arff
+    Baselines(performance, maximize).write(os.path.join(total_dir, 'baselines.json'))
+
+    with open(os.path.join(total_dir, 'description.txt'), 'w') as fp:
+        yaml.dump(description, fp, default_flow_style=False)
 
 
 def generate_scenario(setupid_setupname: Dict[int, str], tasks: List[int], measure: str, output_dir: str,
-                      scenario_name: str, require_complete: bool=False):
+                      scenario_name: str, require_complete: bool=False, n_jobs: int=8,
+                      cache: Optional[MetadataCache]=None, incremental: bool=False,
+                      binary: bool=False, profiler: Optional[Profiler]=None, prune_incomplete: bool=False,
+                      min_coverage: float=1.0, feature_coverage: float=1.0, per_fold: bool=False):
     """
     generates an ASlib scenario, and stores it to disk
 
@@ -69,136 +239,321 @@ def generate_scenario(setupid_setupname: Dict[int, str], tasks: List[int], measu
     :param require_complete: bool
         if True, the script requires all estimators to be ran on all tasks (and throws an error if this condition is
         not met). Otherwise, an empty value (not finished) is recorded and run_status is set to other.
+    :param n_jobs: int
+        the maximum number of concurrent requests to the OpenML server
+    :param cache: MetadataCache
+        if set, all metadata (evaluations, qualities, setups and flows) is served from and stored in this cache. When
+        the cache is in offline mode, no requests are made to the OpenML server
+    :param incremental: bool
+        if True, the scenario that was generated earlier in the same directory (and its manifest) is reused. Only
+        evaluations, qualities and setups that were not obtained before are requested from OpenML, and merged. The
+        cells without result are always requested from OpenML (not from the cache), as these might have new runs. If
+        there is no earlier scenario, it is generated from scratch
+    :param binary: bool
+        if True, also a binary columnar copy of the performance matrix, run status and feature matrix is stored (in
+        the subdirectory 'binary'), which can be loaded (memory-mapped) with load_scenario_arrays
+    :param profiler: Profiler
+        records the metrics of each phase (evaluations, qualities, setups, serialization), which are stored in
+        profile.json next to the description. If not set, a profiler without memory tracing is used
+    :param prune_incomplete: bool
+        if True, tasks and setups are dropped until (at least a fraction min_coverage of) the remaining grid is
+        observed, instead of raising an error on tasks or setups without results. Which ones were dropped is reported
+        in pruning.json next to the description
+    :param min_coverage: float
+        the minimal fraction of observed cells in the grid that remains after pruning (1.0 means a complete grid)
+    :param feature_coverage: float
+        the minimal fraction of tasks on which a quality should be known to be used as feature (missing values are
+        written as '?'). Features are grouped into feature steps per quality family
+    :param per_fold: bool
+        if True, the values of all folds and repetitions are obtained instead of the aggregated values. These are
+        aggregated while they are received (the mean, standard deviation and number of fold values per cell are
+        stored in performance_statistics.arff), and algorithm_runs.arff gets a row per repetition. Can not be
+        combined with incremental
     """
+    if per_fold and incremental:
+        raise ValueError('Per fold evaluations can not be obtained incrementally')
     # make directory first (in case of failure)
     total_dir = os.path.join(output_dir, scenario_name)
     os.makedirs(total_dir, exist_ok=True)
+    if profiler is None:
+        profiler = Profiler(trace_memory=False)
 
     setupname_setupid = collections.defaultdict(list)
     for id, name in setupid_setupname.items():
         setupname_setupid[name].append(id)
 
-    setup_flowid = {}
     task_data_id = {}
-    task_setup_result = {}
-    task_qualities = {}
-    obtained_tasks = set()
-    obtained_partialsetups = set()
+    obtained_cells = set()
+    # rows and columns follow the order in which tasks and setup names were provided
+    performance = PerformanceMatrix(tasks, setupid_setupname.values())
 
     # obtain the data and book keeping
-    evaluations = openml.evaluations.list_evaluations(function=measure, setup=setupid_setupname.keys(), task=tasks)
-    for run_id in evaluations.keys():
-        task_id = evaluations[run_id].task_id
-        flow_id = evaluations[run_id].flow_id
-        data_id = evaluations[run_id].data_id
-        setup_id = evaluations[run_id].setup_id
-        value = evaluations[run_id].value
-
-        task_data_id[task_id] = data_id
-        setup_flowid[setup_id] = flow_id
-        obtained_tasks.add(task_id)
-        obtained_partialsetups.add(setupid_setupname[setup_id])
-
-        if task_id not in task_setup_result:
-            task_setup_result[task_id] = {}
-        task_setup_result[task_id][setupid_setupname[setup_id]] = value
+    with profiler.phase('evaluations'):
+        if incremental and os.path.isfile(os.path.join(total_dir, 'manifest.json')):
+            previous = load_previous_scenario(total_dir, measure)
+            task_set = set(tasks)
+            # reuse the results on cells that are still part of the grid (under the same setup name)
+            for task_id, setup_id, setup_name in previous.cells:
+                if task_id in task_set and setupid_setupname.get(setup_id) == setup_name and \
+                        setup_name in previous.task_setup_result.get(task_id, {}):
+                    task_data_id[task_id] = previous.task_data_id[task_id]
+                    obtained_cells.add((task_id, setup_id, setup_name))
+                    performance.set(task_id, setup_name, previous.task_setup_result[task_id][setup_name])
+            # only the cells that had no result are requested again, bypassing the cache (which can not know about
+            # runs that were uploaded since)
+            new_cells = [(task_id, setup_id) for task_id in task_set
+                         for setup_id, setup_name in setupid_setupname.items()
+                         if (task_id, setup_id, setup_name) not in previous.cells]
+            evaluations = fetch_evaluation_cells(measure, new_cells, n_jobs=n_jobs, cache=cache, profiler=profiler,
+                                                 refresh=True)
+        elif per_fold:
+            previous = None
+            evaluations = dict()
+            statistics = RunningStatistics(tasks, setupid_setupname.values())
+            # the tasks are obtained block by block, so only the fold values of one block are in memory at once
+            for task_block in _chunks(tasks, 100):
+                block_evaluations = fetch_evaluations(measure, setupid_setupname.keys(), task_block, n_jobs=n_jobs,
+                                                      cache=cache, profiler=profiler, per_fold=True)
+                for evaluation in block_evaluations.values():
+                    task_data_id[evaluation.task_id] = evaluation.data_id
+                    obtained_cells.add((evaluation.task_id, evaluation.setup_id,
+                                        setupid_setupname[evaluation.setup_id]))
+                    statistics.add(evaluation.task_id, setupid_setupname[evaluation.setup_id], evaluation.values)
+            # the performance of a cell is the mean over all its folds
+            performance.values = statistics.mean.copy()
+            performance.observed = statistics.observed
+        else:
+            previous = None
+            evaluations = fetch_evaluations(measure, setupid_setupname.keys(), tasks, n_jobs=n_jobs, cache=cache,
+                                            profiler=profiler)
+        for evaluation in evaluations.values():
+            task_data_id[evaluation.task_id] = evaluation.data_id
+            obtained_cells.add((evaluation.task_id, evaluation.setup_id, setupid_setupname[evaluation.setup_id]))
+            performance.set(evaluation.task_id, setupid_setupname[evaluation.setup_id], evaluation.value)
 
-    # this means there were zero results on this task. Throw error so user can throw it out.
-    if obtained_tasks != set(tasks):
-        raise Warning('Tasks not found in evaluation list: %s' % (set(tasks) - obtained_tasks))
-    # this means there were zero results on this partialsetup. Throw error so user can throw it out.
-    if obtained_partialsetups != set(setupid_setupname.values()):
-        missing = set(setupid_setupname.values()) - obtained_partialsetups
-        raise Warning('Setups not found in evaluation list: %s' % missing)
+    # the manifest holds all obtained cells, also the ones that are pruned from the scenario
+    obtained_performance = performance
+    if prune_incomplete:
+        performance = _prune_grid(total_dir, performance, min_coverage)
+    _check_obtained_grid(performance, tasks, setupid_setupname)
+    obtained_tasks = performance.task_ids
+    obtained_partialsetups = performance.algorithms
 
     # obtain the meta-features
-    complete_quality_set = None
-    for task_id in obtained_tasks:
-        qualities = openml.datasets.get_dataset(task_data_id[task_id]).qualities
-        task_qualities[task_id] = qualities
-        if complete_quality_set is None:
-            complete_quality_set = qualities.keys()
+    with profiler.phase('qualities'):
+        # only the qualities are obtained (not the datasets), once per dataset. Those obtained earlier are reused,
+        # the features are selected again, as these depend on the qualities of all tasks
+        data_ids = {task_data_id[task_id] for task_id in obtained_tasks}
+        data_qualities = {data_id: qualities for data_id, qualities in previous.data_qualities.items()
+                          if data_id in data_ids} if previous is not None else {}
+        data_qualities.update(fetch_qualities(data_ids - set(data_qualities), n_jobs=n_jobs, cache=cache,
+                                              profiler=profiler))
+        task_qualities = {task_id: data_qualities[task_data_id[task_id]] for task_id in obtained_tasks}
+        features = build_feature_matrix(obtained_tasks, task_qualities, min_coverage=feature_coverage)
+
+    with profiler.phase('setups'):
+        algos = dict()
+        unresolved = []
+        for setup_name in obtained_partialsetups:
+            if previous is not None and setup_name in previous.algos and \
+                    previous.algorithm_setups.get(setup_name) == sorted(setupname_setupid[setup_name]):
+                algos[setup_name] = previous.algos[setup_name]
+            else:
+                unresolved.append(setup_name)
+
+        # all setups are listed at once, and every distinct flow is obtained once
+        setups = fetch_setups([setup_id for setup_name in unresolved for setup_id in setupname_setupid[setup_name]],
+                              n_jobs=n_jobs, cache=cache, profiler=profiler)
+        setupname_flowid = _setups_to_flow_ids(unresolved, setupname_setupid, setups)
+        flows = fetch_flows(setupname_flowid.values(), n_jobs=n_jobs, cache=cache, profiler=profiler)
+        algos.update(_algorithms_description(unresolved, setupname_setupid, setups, setupname_flowid, flows))
+
+    with profiler.phase('serialization'):
+        _write_scenario(total_dir, scenario_name, measure, performance, features, algos, require_complete, binary,
+                        statistics if per_fold else None)
+        if per_fold:
+            # the repetition rows can not be reused incrementally, so an earlier manifest is removed
+            if os.path.isfile(os.path.join(total_dir, 'manifest.json')):
+                os.remove(os.path.join(total_dir, 'manifest.json'))
         else:
-            complete_quality_set = complete_quality_set & qualities.keys()
-        print(task_id, qualities)
-    complete_quality_set = list(complete_quality_set)
-    print(complete_quality_set)
+            write_manifest(total_dir, measure, obtained_cells, obtained_performance, task_data_id,
+                           {setup_name: setupname_setupid[setup_name]
+                            for setup_name in obtained_performance.observed_algorithms()},
+                           data_qualities)
+    profiler.write(os.path.join(total_dir, 'profile.json'))
 
-    algos = dict()
-    for setup_name in obtained_partialsetups:
-        setup_list = openml.setups.list_setups(setup=setupname_setupid[setup_name])
-        if set(setup_list.keys()) != set(setupname_setupid[setup_name]):
-            missing = set(setupname_setupid[setup_name]) - set(setup_list.keys())
-            raise ValueError('Did not retrieve the following setups: %s' % missing)
 
-        # check if all setups are from the same flow
-        flow_id = list(setup_list.values())[0].flow_id
-        for sid, setup in setup_list.items():
-            if setup.flow_id != flow_id:
-                raise ValueError('Not all setups are generated by same flow for %s' % setup_name)
-        flow = openml.flows.get_flow(flow_id)
+async def generate_scenario_async(setupid_setupname: Dict[int, str], tasks: List[int], measure: str, output_dir: str,
+                                  scenario_name: str, require_complete: bool=False, n_jobs: int=8,
+                                  cache: Optional[MetadataCache]=None, binary: bool=False,
+                                  profiler: Optional[Profiler]=None, client: Optional[AsyncOpenMLClient]=None,
+                                  prune_incomplete: bool=False, min_coverage: float=1.0, feature_coverage: float=1.0):
+    """
+    asynchronous twin of generate_scenario, that talks to the OpenML REST API directly (instead of through the openml
+    package). All requests share a pool of connections, and the requests of each phase are in flight concurrently,
+    so that generation is bound by the throughput of the server rather than by the latency of single requests. The
+    scenario that is written is identical to the one of generate_scenario (incremental generation is not supported)
 
-        algos[setup_name] = {'desterministic': True,
-                             'version': flow.version,
-                             'configuration': ''}  # TODO! use the hyperparameter dict from setup list
+    :param n_jobs: int
+        the maximum number of requests in flight (ignored when client is set)
+    :param client: AsyncOpenMLClient
+        the client used to talk to the server (e.g., to share it between scenarios, or to use another server). If not
+        set, a client for the configured OpenML server is created and closed afterwards
 
-    description = {'scenario_id': 'OpenML_' + scenario_name,
-                   'performance_measures': [measure],
-                   'maximize': [True],
-                   'performance_type': [measure],
-                   'algorithm_cutoff_time': 0,
-                   'algorithm_cutoff_memory': '?',
-                   'features_cutoff_time': '?',
-                   'features_cutoff_memory': '?',
-                   'algorithms_deterministic': algos,
-                   'algorithms_stochastic': '',
-                   'features_deterministic': complete_quality_set,
-                   'features_stochastic': '',
-                   'number_of_feature_steps': 1,
-                   'feature_steps': {'ALL': {'provides': complete_quality_set}},
-                   'default_steps': ['ALL']}
-
-    run_arff = _obtained_data_to_run_arff(obtained_tasks,
-                                          obtained_partialsetups,
-                                          task_setup_result,
-                                          measure,
-                                          require_complete)
-    with open(os.path.join(total_dir, 'algorithm_runs.arff'), 'w') as fp:
-        arff.dump(run_arff, fp)
+    See generate_scenario for the other parameters
+    """
+    total_dir = os.path.join(output_dir, scenario_name)
+    os.makedirs(total_dir, exist_ok=True)
+    if profiler is None:
+        profiler = Profiler(trace_memory=False)
+    own_client = client is None
+    if own_client:
+        client = AsyncOpenMLClient(max_in_flight=n_jobs)
 
-    qualitystatus_attributes = [
-        ['instance_id', 'STRING'],
-        ['repetition', 'NUMERIC'],
-        ['ALL', ['ok', 'timeout', 'memout', 'not_applicable', 'crash', 'other']]
-    ]
-    qualitystatus_data = []
-    qualities_attributes = [['instance_id', 'STRING'],
-                            ['repetition', 'NUMERIC']]
-    for f in complete_quality_set:
-        qualities_attributes.append([f, 'NUMERIC'])
-    qualities_data = []
-    for task_id in obtained_tasks:
-        current_line = [task_id, '1']
-        for idx, quality in enumerate(complete_quality_set):
-            current_value = task_qualities[task_id][quality]
-            current_line.append(current_value)
-        qualities_data.append(current_line)
-        qualitystatus_data.append([task_id, '1', 'ok'])
-
-    qualities_arff = {'attributes': qualities_attributes,
-                      'data': qualities_data,
-                      'relation': 'FEATURES'
-                     }
-    with open(os.path.join(total_dir, 'feature_values.arff'), 'w') as fp:
-        arff.dump(qualities_arff, fp)
+    try:
+        setupname_setupid = collections.defaultdict(list)
+        for id, name in setupid_setupname.items():
+            setupname_setupid[name].append(id)
 
-    qualitystatus_arff = {'attributes': qualitystatus_attributes,
-                          'data': qualitystatus_data,
-                          'relation': 'FEATURES_RUNSTATUS'
-                         }
+        task_data_id = {}
+        obtained_cells = set()
+        performance = PerformanceMatrix(tasks, setupid_setupname.values())
 
-    with open(os.path.join(total_dir, 'feature_runstatus.arff'), 'w') as fp:
-        arff.dump(qualitystatus_arff, fp)
+        with profiler.phase('evaluations'):
+            evaluations = await fetch_evaluations_async(client, measure, setupid_setupname.keys(), tasks, cache=cache,
+                                                        profiler=profiler)
+            for evaluation in evaluations.values():
+                task_data_id[evaluation.task_id] = evaluation.data_id
+                obtained_cells.add((evaluation.task_id, evaluation.setup_id, setupid_setupname[evaluation.setup_id]))
+                performance.set(evaluation.task_id, setupid_setupname[evaluation.setup_id], evaluation.value)
+        obtained_performance = performance
+        if prune_incomplete:
+            performance = _prune_grid(total_dir, performance, min_coverage)
+        _check_obtained_grid(performance, tasks, setupid_setupname)
 
-    with open(os.path.join(total_dir, 'description.txt'), 'w') as fp:
-        yaml.dump(description, fp, default_flow_style=False)
+        with profiler.phase('qualities'):
+            data_qualities = await fetch_qualities_async(client, [task_data_id[task_id]
+                                                                  for task_id in performance.task_ids],
+                                                         cache=cache, profiler=profiler)
+            task_qualities = {task_id: data_qualities[task_data_id[task_id]] for task_id in performance.task_ids}
+
+        with profiler.phase('setups'):
+            setups = await fetch_setups_async(client, setupid_setupname.keys(), cache=cache, profiler=profiler)
+            setupname_flowid = _setups_to_flow_ids(performance.algorithms, setupname_setupid, setups)
+            flows = await fetch_flows_async(client, setupname_flowid.values(), cache=cache, profiler=profiler)
+            algos = _algorithms_description(performance.algorithms, setupname_setupid, setups, setupname_flowid,
+                                            flows)
+    finally:
+        if own_client:
+            client.close()
+
+    with profiler.phase('serialization'):
+        features = build_feature_matrix(performance.task_ids, task_qualities, min_coverage=feature_coverage)
+        _write_scenario(total_dir, scenario_name, measure, performance, features, algos, require_complete, binary)
+        write_manifest(total_dir, measure, obtained_cells, obtained_performance, task_data_id,
+                       {setup_name: setupname_setupid[setup_name]
+                        for setup_name in obtained_performance.observed_algorithms()},
+                       data_qualities)
+    profiler.write(os.path.join(total_dir, 'profile.json'))
+
+
+def generate_scenarios(specs: List[ScenarioSpec], output_dir: str, require_complete: bool=False, n_jobs: int=8,
+                       cache: Optional[MetadataCache]=None, binary: bool=False,
+                       profiler: Optional[Profiler]=None, feature_coverage: float=1.0):
+    """
+    generates several ASlib scenarios (e.g., for several measures, or subsets of a study) from one shared fetch, and
+    stores these to disk. The evaluations of each measure are obtained once for the union of all tasks and setups of
+    that measure. The qualities, setups and flows are obtained once for all scenarios.
+
+    :param specs: list
+        the ScenarioSpec of each scenario to generate. The names should be unique
+    :param output_dir: str
+        location where to save the scenarios (each in a subdirectory with its name)
+    :param require_complete: bool
+        if True, all estimators should be ran on all tasks in every scenario (see generate_scenario)
+    :param n_jobs: int
+        the maximum number of concurrent requests to the OpenML server
+    :param cache: MetadataCache
+        if set, all metadata is served from and stored in this cache
+    :param binary: bool
+        if True, also a binary copy of each scenario is stored (see generate_scenario)
+    :param profiler: Profiler
+        records the metrics of each phase, which are stored in profile.json in the output directory
+    :param feature_coverage: float
+        the minimal fraction of tasks on which a quality should be known to be used as feature (see generate_scenario)
+    """
+    names = [spec.name for spec in specs]
+    if len(set(names)) != len(names):
+        raise ValueError('Scenario names should be unique: %s' % names)
+    os.makedirs(output_dir, exist_ok=True)
+    if profiler is None:
+        profiler = Profiler(trace_memory=False)
+
+    # the evaluations of each measure, indexed per (task id, setup id) cell
+    measure_cell_evaluations = dict()
+    with profiler.phase('evaluations'):
+        measure_specs = collections.defaultdict(list)
+        for spec in specs:
+            measure_specs[spec.measure].append(spec)
+        for measure, current_specs in measure_specs.items():
+            setup_ids = {setup_id for spec in current_specs for setup_id in spec.setupid_setupname}
+            task_ids = {task_id for spec in current_specs for task_id in spec.tasks}
+            evaluations = fetch_evaluations(measure, setup_ids, task_ids, n_jobs=n_jobs, cache=cache,
+                                            profiler=profiler)
+            cell_evaluations = collections.defaultdict(list)
+            for evaluation in evaluations.values():
+                cell_evaluations[(evaluation.task_id, evaluation.setup_id)].append(evaluation)
+            measure_cell_evaluations[measure] = cell_evaluations
+
+    # the performance matrix of each scenario, taken from the shared evaluations
+    spec_performance = dict()
+    spec_cells = dict()
+    task_data_id = dict()
+    for spec in specs:
+        performance = PerformanceMatrix(spec.tasks, spec.setupid_setupname.values())
+        cells = set()
+        cell_evaluations = measure_cell_evaluations[spec.measure]
+        for task_id in performance.task_ids:
+            for setup_id, setup_name in spec.setupid_setupname.items():
+                for evaluation in cell_evaluations.get((task_id, setup_id), []):
+                    task_data_id[task_id] = evaluation.data_id
+                    cells.add((task_id, setup_id, setup_name))
+                    performance.set(task_id, setup_name, evaluation.value)
+        _check_obtained_grid(performance, spec.tasks, spec.setupid_setupname)
+        spec_performance[spec.name] = performance
+        spec_cells[spec.name] = cells
+
+    with profiler.phase('qualities'):
+        data_qualities = fetch_qualities(task_data_id.values(), n_jobs=n_jobs, cache=cache, profiler=profiler)
+        task_qualities = {task_id: data_qualities[data_id] for task_id, data_id in task_data_id.items()}
+
+    with profiler.phase('setups'):
+        setups = fetch_setups({setup_id for spec in specs for setup_id in spec.setupid_setupname},
+                              n_jobs=n_jobs, cache=cache, profiler=profiler)
+        spec_setupname_setupid = dict()
+        spec_setupname_flowid = dict()
+        for spec in specs:
+            setupname_setupid = collections.defaultdict(list)
+            for id, name in spec.setupid_setupname.items():
+                setupname_setupid[name].append(id)
+            spec_setupname_setupid[spec.name] = setupname_setupid
+            spec_setupname_flowid[spec.name] = _setups_to_flow_ids(spec_performance[spec.name].algorithms,
+                                                                   setupname_setupid, setups)
+        flows = fetch_flows({flow_id for setupname_flowid in spec_setupname_flowid.values()
+                             for flow_id in setupname_flowid.values()}, n_jobs=n_jobs, cache=cache, profiler=profiler)
+
+    with profiler.phase('serialization'):
+        for spec in specs:
+            total_dir = os.path.join(output_dir, spec.name)
+            os.makedirs(total_dir, exist_ok=True)
+            performance = spec_performance[spec.name]
+            setupname_setupid = spec_setupname_setupid[spec.name]
+            algos = _algorithms_description(performance.algorithms, setupname_setupid, setups,
+                                            spec_setupname_flowid[spec.name], flows)
+            features = build_feature_matrix(performance.task_ids, task_qualities, min_coverage=feature_coverage)
+            _write_scenario(total_dir, spec.name, spec.measure, performance, features, algos, require_complete, binary)
+            spec_task_data_id = {task_id: task_data_id[task_id] for task_id in performance.task_ids}
+            write_manifest(total_dir, spec.measure, spec_cells[spec.name], performance, spec_task_data_id,
+                           {setup_name: setupname_setupid[setup_name] for setup_name in performance.algorithms},
+                           {data_id: data_qualities[data_id] for data_id in spec_task_data_id.values()})
+    profiler.write(os.path.join(output_dir, 'profile.json'))
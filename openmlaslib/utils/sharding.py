@@ -0,0 +1,217 @@
+import collections
+import concurrent.futures
+import numpy as np
+import os
+
+from .cache import MetadataCache
+from .fetch import fetch_evaluations, fetch_flows, fetch_qualities, fetch_setups
+from .features import build_feature_matrix
+from .manifest import write_manifest
+from .matrix import PerformanceMatrix
+from .profiling import Profiler
+from .scenario import _algorithms_description, _check_obtained_grid, _prune_grid, _setups_to_flow_ids, \
+    _write_scenario
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def _shard_path(work_dir: str, shard: int) -> str:
+    return os.path.join(work_dir, 'shard_%05d.npz' % shard)
+
+
+def _process_shard(shard: int, task_ids: List[int], setupid_setupname: Dict[int, str], measure: str, work_dir: str,
+                   n_jobs: int, cache_settings: Optional[Tuple[str, Optional[float], Optional[int], bool]]
+                   ) -> Dict[str, Any]:
+    """
+    Helper function that obtains the evaluations of a shard of tasks and stores them as partial result (a compressed
+    npz archive). Executed in a worker process
+
+    :return: dict
+        the metrics of the shard (API calls, bytes received and cache lookups), to be merged into the profiler of the
+        caller
+    """
+    profiler = Profiler(trace_memory=False)
+    cache = None if cache_settings is None else MetadataCache(*cache_settings)
+    try:
+        performance = PerformanceMatrix(task_ids, setupid_setupname.values())
+        cells = []
+        task_data_id = dict()
+        with profiler.phase('shard') as metrics:
+            for evaluation in fetch_evaluations(measure, setupid_setupname.keys(), task_ids, n_jobs=n_jobs,
+                                                cache=cache, profiler=profiler).values():
+                task_data_id[evaluation.task_id] = evaluation.data_id
+                cells.append((evaluation.task_id, evaluation.setup_id))
+                performance.set(evaluation.task_id, setupid_setupname[evaluation.setup_id], evaluation.value)
+    finally:
+        if cache is not None:
+            cache.close()
+
+    # written to a temporary file first, so that a partial result is either complete or absent
+    path = _shard_path(work_dir, shard)
+    with open(path + '.tmp', 'wb') as fp:
+        np.savez_compressed(fp,
+                            measure=np.array(measure),
+                            task_ids=np.asarray(performance.task_ids, dtype=np.int64),
+                            algorithms=np.array(performance.algorithms, dtype=str),
+                            setup_ids=np.array(sorted(setupid_setupname), dtype=np.int64),
+                            setup_names=np.array([setupid_setupname[setup_id] for setup_id
+                                                  in sorted(setupid_setupname)], dtype=str),
+                            values=performance.values,
+                            observed=performance.observed,
+                            cells=np.array(cells, dtype=np.int64).reshape(-1, 2),
+                            data_ids=np.array([task_data_id.get(task_id, -1) for task_id in performance.task_ids],
+                                              dtype=np.int64))
+    os.replace(path + '.tmp', path)
+    return metrics
+
+
+def _load_shard(path: str, measure: str, task_ids: List[int], algorithms: List[str],
+                setupid_setupname: Dict[int, str]) -> Optional[Dict[str, Any]]:
+    """
+    Helper function that reads a partial result, if it exists and was produced for the same shard, measure and
+    mapping from setup id to setup name
+
+    :return: dict
+        the arrays of the partial result, or None
+    """
+    if not os.path.isfile(path):
+        return None
+    with np.load(path) as partial:
+        arrays = {name: partial[name] for name in partial.files}
+    setups = sorted(setupid_setupname.items())
+    if str(arrays['measure']) != measure or arrays['task_ids'].tolist() != task_ids or \
+            arrays['algorithms'].tolist() != algorithms or 'setup_ids' not in arrays or \
+            list(zip(arrays['setup_ids'].tolist(), arrays['setup_names'].tolist())) != setups:
+        return None
+    return arrays
+
+
+def generate_scenario_sharded(setupid_setupname: Dict[int, str], tasks: List[int], measure: str, output_dir: str,
+                              scenario_name: str, shard_size: int=100, n_jobs: int=4, n_fetch_jobs: int=4,
+                              max_retries: int=1, work_dir: Optional[str]=None, require_complete: bool=False,
+                              cache: Optional[MetadataCache]=None, binary: bool=False,
+                              profiler: Optional[Profiler]=None, prune_incomplete: bool=False,
+                              min_coverage: float=1.0, feature_coverage: float=1.0):
+    """
+    generates an ASlib scenario like generate_scenario, spreading the work over processes (map-reduce). The tasks are
+    split into shards, and worker processes obtain the evaluations of each shard and store these as partial result in
+    the work directory. The partial results are then merged and checked for completeness across the shards, the
+    qualities are obtained once per dataset (tasks of different shards can share a dataset), and the scenario is
+    written. Shards that failed are retried individually, and partial results that exist
+    from an earlier call (with the same shards) are reused, so calling again after a failure only processes the
+    remaining shards.
+
+    :param shard_size: int
+        the number of tasks per shard
+    :param n_jobs: int
+        the number of worker processes. With 1, all shards are processed in the current process
+    :param n_fetch_jobs: int
+        the maximum number of concurrent requests to the OpenML server per worker process
+    :param max_retries: int
+        the number of times a failed shard is retried before giving up
+    :param work_dir: str
+        location of the partial results (default: the subdirectory 'shards' of the scenario directory). These are
+        kept after generation
+    :param cache: MetadataCache
+        if set, all metadata is served from and stored in this cache. Every worker process opens its own connection
+
+    See generate_scenario for the other parameters
+    """
+    if shard_size < 1:
+        raise ValueError('shard_size should be at least 1, got %d' % shard_size)
+    if n_jobs < 1:
+        raise ValueError('n_jobs should be at least 1, got %d' % n_jobs)
+    total_dir = os.path.join(output_dir, scenario_name)
+    work_dir = os.path.join(total_dir, 'shards') if work_dir is None else work_dir
+    # make directories first (in case of failure)
+    os.makedirs(total_dir, exist_ok=True)
+    os.makedirs(work_dir, exist_ok=True)
+    if profiler is None:
+        profiler = Profiler(trace_memory=False)
+
+    setupname_setupid = collections.defaultdict(list)
+    for id, name in setupid_setupname.items():
+        setupname_setupid[name].append(id)
+    performance = PerformanceMatrix(tasks, setupid_setupname.values())
+    # the shards are formed in the order of the tasks (unlike _chunks, which sorts)
+    shards = [performance.task_ids[start:start + shard_size]
+              for start in range(0, len(performance.task_ids), shard_size)]
+    cache_settings = None if cache is None else (cache.path, cache.ttl, cache.max_size, cache.offline)
+
+    # map: every shard that has no (valid) partial result yet is processed
+    with profiler.phase('shards'):
+        todo = [shard for shard, task_ids in enumerate(shards)
+                if _load_shard(_shard_path(work_dir, shard), measure, task_ids, performance.algorithms,
+                               setupid_setupname) is None]
+        failed = dict()
+        for attempt in range(max_retries + 1):
+            if len(todo) == 0:
+                break
+            if n_jobs == 1:
+                results = dict()
+                for shard in todo:
+                    try:
+                        profiler.merge(_process_shard(shard, shards[shard], setupid_setupname, measure, work_dir,
+                                                      n_fetch_jobs, cache_settings))
+                    except Exception as e:
+                        results[shard] = e
+            else:
+                with concurrent.futures.ProcessPoolExecutor(max_workers=min(n_jobs, len(todo))) as executor:
+                    futures = {executor.submit(_process_shard, shard, shards[shard], setupid_setupname, measure,
+                                               work_dir, n_fetch_jobs, cache_settings): shard for shard in todo}
+                    results = dict()
+                    # the workers have their own profiler, their metrics are recorded in this phase
+                    for future in concurrent.futures.as_completed(futures):
+                        try:
+                            profiler.merge(future.result())
+                        except Exception as e:
+                            results[futures[future]] = e
+            failed = results
+            todo = sorted(failed)
+        if len(failed) > 0:
+            shard = min(failed)
+            raise ValueError('Processing failed on %d shards, e.g., shard %d (tasks %d-%d): %s. Call again with the '
+                             'same work directory to retry these' % (len(failed), shard, shards[shard][0],
+                                                                     shards[shard][-1], failed[shard]))
+
+    # reduce: the partial results are merged into one performance matrix
+    with profiler.phase('reduce'):
+        obtained_cells = set()
+        task_data_id = dict()
+        for shard, task_ids in enumerate(shards):
+            partial = _load_shard(_shard_path(work_dir, shard), measure, task_ids, performance.algorithms,
+                                  setupid_setupname)
+            rows = [performance.task_index[task_id] for task_id in task_ids]
+            performance.values[rows] = partial['values']
+            performance.observed[rows] = partial['observed']
+            for task_id, setup_id in partial['cells'].tolist():
+                obtained_cells.add((task_id, setup_id, setupid_setupname[setup_id]))
+            for task_id, data_id in zip(task_ids, partial['data_ids'].tolist()):
+                if data_id >= 0:
+                    task_data_id[task_id] = data_id
+        # the manifest holds all obtained cells, also the ones that are pruned from the scenario
+        obtained_performance = performance
+        if prune_incomplete:
+            performance = _prune_grid(total_dir, performance, min_coverage)
+        _check_obtained_grid(performance, tasks, setupid_setupname)
+
+    with profiler.phase('qualities'):
+        data_qualities = fetch_qualities({task_data_id[task_id] for task_id in performance.task_ids},
+                                         n_jobs=n_fetch_jobs, cache=cache, profiler=profiler)
+        task_qualities = {task_id: data_qualities[task_data_id[task_id]] for task_id in performance.task_ids}
+        features = build_feature_matrix(performance.task_ids, task_qualities, min_coverage=feature_coverage)
+
+    with profiler.phase('setups'):
+        setups = fetch_setups([setup_id for setup_name in performance.algorithms
+                               for setup_id in setupname_setupid[setup_name]], n_jobs=n_fetch_jobs, cache=cache,
+                              profiler=profiler)
+        setupname_flowid = _setups_to_flow_ids(performance.algorithms, setupname_setupid, setups)
+        flows = fetch_flows(setupname_flowid.values(), n_jobs=n_fetch_jobs, cache=cache, profiler=profiler)
+        algos = _algorithms_description(performance.algorithms, setupname_setupid, setups, setupname_flowid, flows)
+
+    with profiler.phase('serialization'):
+        _write_scenario(total_dir, scenario_name, measure, performance, features, algos, require_complete, binary)
+        write_manifest(total_dir, measure, obtained_cells, obtained_performance, task_data_id,
+                       {setup_name: setupname_setupid[setup_name]
+                        for setup_name in obtained_performance.observed_algorithms()},
+                       data_qualities)
+    profiler.write(os.path.join(total_dir, 'profile.json'))
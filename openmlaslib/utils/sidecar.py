@@ -0,0 +1,88 @@
+import collections
+import json
+import numpy as np
+import os
+
+from .matrix import PerformanceMatrix
+from typing import Dict, List
+
+
+# the order of the ASlib run status values, runstatus arrays contain indices into this list
+RUNSTATUS = ['ok', 'timeout', 'memout', 'not_applicable', 'crash', 'other']
+
+# binary copy of a scenario. All arrays have a row per task (in the order of task_ids)
+ScenarioArrays = collections.namedtuple('ScenarioArrays', ['measure', 'task_ids', 'algorithms', 'feature_names',
+                                                           'feature_steps', 'performance', 'runstatus', 'features',
+                                                           'feature_runstatus'])
+
+SIDECAR_DIR = 'binary'
+
+
+def write_scenario_arrays(directory: str, measure: str, performance: PerformanceMatrix, feature_names: List[str],
+                          features: np.ndarray, feature_runstatus: np.ndarray, feature_steps: Dict[str, List[str]]):
+    """
+    stores a binary columnar copy of a scenario in the subdirectory 'binary' of the scenario directory. Every array is
+    stored as a separate .npy file (so it can be memory-mapped), the names are stored in index.json
+
+    :param directory: str
+        the directory of the scenario
+    :param measure: str
+        the evaluation measure of the scenario
+    :param performance: PerformanceMatrix
+        the performance matrix (cells that were not observed get status other)
+    :param feature_names: list
+        the names of the features (columns of the feature matrix)
+    :param features: np.ndarray
+        the feature matrix, with a row per task in performance.task_ids (missing values are NaN)
+    :param feature_runstatus: np.ndarray
+        the run status of each feature step on each task (tasks x steps, like feature_runstatus.arff), as index into
+        RUNSTATUS
+    :param feature_steps: dict
+        mapping from feature step to the features it provides, in the order of the columns of feature_runstatus
+    """
+    sidecar_dir = os.path.join(directory, SIDECAR_DIR)
+    os.makedirs(sidecar_dir, exist_ok=True)
+    runstatus = np.where(performance.observed, RUNSTATUS.index('ok'), RUNSTATUS.index('other')).astype(np.int8)
+    arrays = {'task_ids': np.asarray(performance.task_ids, dtype=np.int64),
+              'performance': performance.values,
+              'runstatus': runstatus,
+              'features': np.asarray(features, dtype=np.float64),
+              'feature_runstatus': np.asarray(feature_runstatus, dtype=np.int8)}
+    for name, array in arrays.items():
+        np.save(os.path.join(sidecar_dir, name + '.npy'), array)
+    index = {'measure': measure,
+             'algorithms': performance.algorithms,
+             'feature_names': feature_names,
+             'feature_steps': [[step, provides] for step, provides in feature_steps.items()],
+             'runstatus': RUNSTATUS}
+    with open(os.path.join(sidecar_dir, 'index.json'), 'w') as fp:
+        json.dump(index, fp)
+
+
+def load_scenario_arrays(directory: str, mmap: bool=True) -> ScenarioArrays:
+    """
+    loads the binary copy of a scenario, as written by generate_scenario(binary=True)
+
+    :param directory: str
+        the directory of the scenario
+    :param mmap: bool
+        if True, the arrays are memory-mapped (read-only) instead of read into memory
+    :return: ScenarioArrays
+        the measure, the task ids, algorithm names and feature names, the performance matrix and run status codes
+        (tasks x algorithms), the feature steps with the features they provide, the feature matrix (tasks x features)
+        and the feature run status codes (tasks x feature steps)
+    """
+    sidecar_dir = os.path.join(directory, SIDECAR_DIR)
+    with open(os.path.join(sidecar_dir, 'index.json'), 'r') as fp:
+        index = json.load(fp)
+    if index['runstatus'] != RUNSTATUS:
+        raise ValueError('Binary scenario uses unknown run status codes: %s' % index['runstatus'])
+
+    mmap_mode = 'r' if mmap else None
+    arrays = {name: np.load(os.path.join(sidecar_dir, name + '.npy'), mmap_mode=mmap_mode)
+              for name in ['task_ids', 'performance', 'runstatus', 'features', 'feature_runstatus']}
+    return ScenarioArrays(measure=index['measure'],
+                          algorithms=index['algorithms'],
+                          feature_names=index['feature_names'],
+                          feature_steps=collections.OrderedDict(index['feature_steps']),
+                          **arrays)
@@ -0,0 +1,33 @@
+import numpy as np
+import openmlaslib.utils.aggregation
+import unittest
+
+
+class TestRunningStatistics(unittest.TestCase):
+
+    def test_statistics(self):
+        rng = np.random.RandomState(0)
+        statistics = openmlaslib.utils.aggregation.RunningStatistics([1, 2], ['A', 'B'])
+        runs = [rng.rand(2, 10), rng.rand(3, 10)]
+        for run in runs:
+            statistics.add(1, 'A', run.tolist())
+        statistics.add(2, 'B', [0.5])
+        all_values = np.concatenate([run.ravel() for run in runs])
+        self.assertEqual(statistics.count[0, 0], 50)
+        self.assertAlmostEqual(statistics.mean[0, 0], all_values.mean())
+        self.assertAlmostEqual(statistics.std()[0, 0], all_values.std(ddof=1))
+        self.assertTrue(np.isnan(statistics.std()[1, 1]))
+        self.assertEqual(statistics.observed.tolist(), [[True, False], [False, True]])
+        # every repetition of every run is a repetition of the cell
+        self.assertEqual(statistics.num_repetitions[0, 0], 5)
+        self.assertAlmostEqual(statistics.repetition_means[0, 0, 3], runs[1][1].mean())
+
+    def test_rows(self):
+        statistics = openmlaslib.utils.aggregation.RunningStatistics([1], ['A', 'B', 'C'])
+        statistics.add(1, 'A', [[0.25, 0.75], [0.5, 0.5]])
+        statistics.add(1, 'B', [0.5, 0.5])
+        # only the repetitions that exist are written, a missing cell gets a single row
+        self.assertEqual(list(statistics.run_rows([1], ['A', 'B', 'C'])),
+                         [[1, '1', 'A', 0.5, 'ok'], [1, '1', 'B', 0.5, 'ok'], [1, '1', 'C', 0, 'other'],
+                          [1, '2', 'A', 0.5, 'ok']])
+        self.assertEqual(list(statistics.statistics_rows([1], ['B'])), [[1, 'B', 0.5, 0.0, 2]])
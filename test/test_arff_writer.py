@@ -0,0 +1,25 @@
+import arff
+import io
+import openmlaslib.utils.arff_writer
+import unittest
+
+
+class TestArffWriter(unittest.TestCase):
+
+    def test_dump_streaming_identical(self):
+        attributes = [
+            ['instance_id', 'STRING'],
+            ['repetition', 'NUMERIC'],
+            ['algorithm', 'STRING'],
+            ['predictive_accuracy', 'NUMERIC'],
+            ['runstatus', ['ok', 'timeout', 'memout', 'not_applicable', 'crash', 'other']]
+        ]
+        data = [[1701, '1', 'Setup_2361', 0.9512, 'ok'],
+                [1701, '1', 'Setup with, comma', None, 'other'],
+                [1702, '1', "Setup 'quoted'", 0, 'ok']]
+
+        expected = io.StringIO()
+        arff.dump({'relation': 'ALGORITHM_RUNS', 'attributes': attributes, 'data': data}, expected)
+        streamed = io.StringIO()
+        openmlaslib.utils.arff_writer.dump_streaming('ALGORITHM_RUNS', attributes, (row for row in data), streamed)
+        self.assertEqual(expected.getvalue(), streamed.getvalue())
@@ -0,0 +1,124 @@
+import asyncio
+import filecmp
+import openmlaslib
+import openmlaslib.testing
+import openmlaslib.utils.async_fetch
+import os
+import requests
+import shutil
+import time
+import unittest
+
+
+class TestAsyncScenarioCreation(unittest.TestCase):
+
+    def setUp(self):
+        self.default_dir = os.path.expanduser('~').replace('\\', '/') + '/openml-aslib-tests/'
+
+    def tearDown(self):
+        if os.path.isdir(self.default_dir):
+            shutil.rmtree(self.default_dir)
+
+    @staticmethod
+    def _setup_list_to_dict(setup_list):
+        return {id: 'Setup_%d' % id for id in setup_list}
+
+    def test_create_scenario_async(self):
+        fake = openmlaslib.testing.FakeOpenML(num_tasks=12, num_setups=7, density=0.8, num_datasets=5,
+                                              setups_per_flow=2)
+        setupid_setupname = self._setup_list_to_dict(fake.setup_ids)
+        with fake.patch():
+            openmlaslib.utils.generate_scenario(setupid_setupname, fake.task_ids, 'predictive_accuracy',
+                                                os.path.join(self.default_dir, 'sync'), 'scenario')
+        # every third request is rate limited, and is retried by the client
+        with openmlaslib.testing.FakeOpenMLServer(fake, rate_limit_every=3) as server:
+            client = openmlaslib.utils.async_fetch.AsyncOpenMLClient(server=server.url, max_in_flight=4, backoff=0)
+            asyncio.run(openmlaslib.utils.generate_scenario_async(setupid_setupname, fake.task_ids,
+                                                                  'predictive_accuracy',
+                                                                  os.path.join(self.default_dir, 'async'), 'scenario',
+                                                                  client=client))
+            client.close()
+        self.assertGreater(server.num_rate_limited, 0)
+        # qualities are requested once per dataset
+        self.assertEqual(sum(count for call, count in server.requests.items() if call.startswith('data/')), 5)
+
+        for filename in ['algorithm_runs.arff', 'feature_values.arff', 'feature_runstatus.arff', 'description.txt']:
+            self.assertTrue(filecmp.cmp(os.path.join(self.default_dir, 'sync', 'scenario', filename),
+                                        os.path.join(self.default_dir, 'async', 'scenario', filename),
+                                        shallow=False))
+
+    def test_create_scenario_async_non_existing_task(self):
+        fake = openmlaslib.testing.FakeOpenML(num_tasks=3, num_setups=2)
+        with openmlaslib.testing.FakeOpenMLServer(fake) as server:
+            client = openmlaslib.utils.async_fetch.AsyncOpenMLClient(server=server.url)
+            with self.assertRaises(Warning):
+                asyncio.run(openmlaslib.utils.generate_scenario_async(self._setup_list_to_dict(fake.setup_ids),
+                                                                      fake.task_ids + [-1], 'predictive_accuracy',
+                                                                      self.default_dir, 'non_existing_task',
+                                                                      client=client))
+            client.close()
+
+    def test_coalesce_requests(self):
+        fake = openmlaslib.testing.FakeOpenML(num_tasks=2, num_setups=2)
+
+        async def fetch(client):
+            return await asyncio.gather(*[client.get_qualities(1) for _ in range(5)])
+
+        with openmlaslib.testing.FakeOpenMLServer(fake, latency=0.1) as server:
+            client = openmlaslib.utils.async_fetch.AsyncOpenMLClient(server=server.url)
+            results = asyncio.run(fetch(client))
+            client.close()
+        self.assertEqual(results, [fake.qualities(1)] * 5)
+        self.assertEqual(server.requests['data/qualities/1'], 1)
+
+    def test_requests_in_flight(self):
+        fake = openmlaslib.testing.FakeOpenML(num_tasks=8, num_setups=1)
+
+        async def fetch(client):
+            return await openmlaslib.utils.async_fetch.fetch_qualities_async(client, fake.task_data_id.values())
+
+        with openmlaslib.testing.FakeOpenMLServer(fake, latency=0.25) as server:
+            client = openmlaslib.utils.async_fetch.AsyncOpenMLClient(server=server.url, max_in_flight=8)
+            start = time.perf_counter()
+            qualities = asyncio.run(fetch(client))
+            duration = time.perf_counter() - start
+            client.close()
+        self.assertEqual(len(qualities), 8)
+        # sequential requests would take 2 seconds
+        self.assertLess(duration, 1.0)
+
+    def test_multiple_event_loops(self):
+        fake = openmlaslib.testing.FakeOpenML(num_tasks=2, num_setups=1)
+
+        async def fetch(client):
+            return await asyncio.gather(*[client.get_qualities(data_id) for data_id in [1, 2]])
+
+        with openmlaslib.testing.FakeOpenMLServer(fake, latency=0.05) as server:
+            # the requests wait for each other, in the event loop of each call of asyncio.run
+            client = openmlaslib.utils.async_fetch.AsyncOpenMLClient(server=server.url, max_in_flight=1)
+            for _ in range(2):
+                self.assertEqual(asyncio.run(fetch(client)), [fake.qualities(1), fake.qualities(2)])
+            client.close()
+
+    def test_no_qualities(self):
+        # no qualities were computed for any of the datasets, which OpenML reports as an error
+        fake = openmlaslib.testing.FakeOpenML(num_tasks=2, num_setups=1, quality_density=0.0)
+        with fake.patch():
+            self.assertEqual(openmlaslib.utils.fetch.fetch_qualities([1, 2]), {1: {}, 2: {}})
+        with openmlaslib.testing.FakeOpenMLServer(fake) as server:
+            client = openmlaslib.utils.async_fetch.AsyncOpenMLClient(server=server.url)
+            qualities = asyncio.run(openmlaslib.utils.async_fetch.fetch_qualities_async(client, [1, 2]))
+            client.close()
+        self.assertEqual(qualities, {1: {}, 2: {}})
+
+    def test_request_timeout(self):
+        fake = openmlaslib.testing.FakeOpenML(num_tasks=2, num_setups=1)
+        with openmlaslib.testing.FakeOpenMLServer(fake, latency=1.0) as server:
+            client = openmlaslib.utils.async_fetch.AsyncOpenMLClient(server=server.url, max_retries=1, backoff=0,
+                                                                     timeout=0.1)
+            # the stalled request is retried once, and then given up on (without waiting for the response)
+            start = time.perf_counter()
+            with self.assertRaises(requests.exceptions.Timeout):
+                asyncio.run(client.get_qualities(1))
+            self.assertLess(time.perf_counter() - start, 1.0)
+            client.close()
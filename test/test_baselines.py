@@ -0,0 +1,46 @@
+import numpy as np
+import openmlaslib.utils.baselines
+import openmlaslib.utils.matrix
+import unittest
+
+
+class TestBaselines(unittest.TestCase):
+
+    def setUp(self):
+        self.matrix = openmlaslib.utils.matrix.PerformanceMatrix([1, 2, 3], ['A', 'B', 'C'])
+        for task_id, values in zip([1, 2, 3], [[0.9, 0.8, 0.1], [0.5, 0.7, None], [0.6, 0.4, 0.2]]):
+            for algorithm, value in zip(['A', 'B', 'C'], values):
+                if value is not None:
+                    self.matrix.set(task_id, algorithm, value)
+
+    def test_maximize(self):
+        self.assertTrue(openmlaslib.utils.baselines.is_maximized('predictive_accuracy'))
+        self.assertFalse(openmlaslib.utils.baselines.is_maximized('root_mean_squared_error'))
+        baselines = openmlaslib.utils.baselines.Baselines(self.matrix, maximize=True)
+        summary = baselines.to_dict()
+        self.assertEqual(summary['virtual_best']['selection'], {'1': 'A', '2': 'B', '3': 'A'})
+        self.assertAlmostEqual(summary['virtual_best']['mean_performance'], (0.9 + 0.7 + 0.6) / 3)
+        self.assertEqual(summary['virtual_best']['gap_closed'], 1.0)
+        self.assertEqual(summary['single_best']['algorithm'], 'A')
+        self.assertAlmostEqual(summary['single_best']['regret']['2'], 0.2)
+        # without task 3, B is better on average
+        self.assertEqual(summary['leave_one_task_out_single_best']['selection'], {'1': 'A', '2': 'A', '3': 'B'})
+        self.assertAlmostEqual(summary['leave_one_task_out_single_best']['regret']['3'], 0.2)
+        self.assertAlmostEqual(summary['algorithms']['C']['coverage'], 2 / 3)
+
+        score = baselines.score_selection({1: 'A', 2: 'C'})
+        self.assertAlmostEqual(score['mean_performance'], (0.9 + 0.5) / 2)
+        self.assertAlmostEqual(score['mean_regret'], 0.1)
+        self.assertEqual(score['num_solved'], 1)
+        with self.assertRaises(ValueError):
+            baselines.score_selection({4: 'A'})
+        with self.assertRaises(ValueError):
+            baselines.score_selection({1: 'D'})
+
+    def test_minimize(self):
+        baselines = openmlaslib.utils.baselines.Baselines(self.matrix, maximize=False)
+        summary = baselines.to_dict()
+        self.assertEqual(summary['virtual_best']['selection'], {'1': 'C', '2': 'A', '3': 'C'})
+        self.assertAlmostEqual(summary['virtual_best']['mean_performance'], (0.1 + 0.5 + 0.2) / 3)
+        self.assertEqual(summary['single_best']['algorithm'], 'C')
+        self.assertTrue(np.all(baselines.regret >= 0))
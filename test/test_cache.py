@@ -0,0 +1,54 @@
+import openmlaslib
+import openmlaslib.utils.fetch
+import os
+import shutil
+import time
+import unittest
+
+
+class TestMetadataCache(unittest.TestCase):
+
+    def setUp(self):
+        self.default_dir = os.path.expanduser('~').replace('\\', '/') + '/openml-aslib-tests/'
+        self.cache_path = os.path.join(self.default_dir, 'cache.sqlite')
+
+    def tearDown(self):
+        if os.path.isdir(self.default_dir):
+            shutil.rmtree(self.default_dir)
+
+    def test_put_get(self):
+        cache = openmlaslib.utils.MetadataCache(self.cache_path)
+        cache.put_many('qualities', {2: {'NumberOfInstances': 898.0}, 61: {'NumberOfInstances': 150.0}})
+        cache.put_many('evaluations', {(1701, 2361): [0.9]}, measure='predictive_accuracy')
+        cache.close()
+
+        # entries should persist
+        cache = openmlaslib.utils.MetadataCache(self.cache_path)
+        self.assertEqual(cache.get_many('qualities', [2, 61, 3]), {2: {'NumberOfInstances': 898.0},
+                                                                   61: {'NumberOfInstances': 150.0}})
+        self.assertEqual(cache.get_many('evaluations', [(1701, 2361)], measure='predictive_accuracy'),
+                         {(1701, 2361): [0.9]})
+        self.assertEqual(cache.get_many('evaluations', [(1701, 2361)], measure='area_under_roc_curve'), {})
+
+    def test_ttl(self):
+        cache = openmlaslib.utils.MetadataCache(self.cache_path, ttl=0.1)
+        cache.put_many('flows', {1: 'flow'})
+        self.assertEqual(cache.get_many('flows', [1]), {1: 'flow'})
+        time.sleep(0.2)
+        self.assertEqual(cache.get_many('flows', [1]), {})
+
+    def test_max_size(self):
+        cache = openmlaslib.utils.MetadataCache(self.cache_path, max_size=2500)
+        for flow_id in range(5):
+            cache.put_many('flows', {flow_id: 'x' * 1000})
+            # flow 0 is used recently, so it should not be evicted
+            cache.get_many('flows', [0])
+        self.assertEqual(set(cache.get_many('flows', range(5)).keys()), {0, 4})
+
+    def test_offline(self):
+        cache = openmlaslib.utils.MetadataCache(self.cache_path, offline=True)
+        cache.put_many('qualities', {61: {'NumberOfInstances': 150.0}})
+        qualities = openmlaslib.utils.fetch.fetch_qualities([61], cache=cache)
+        self.assertEqual(qualities, {61: {'NumberOfInstances': 150.0}})
+        with self.assertRaises(ValueError):
+            openmlaslib.utils.fetch.fetch_qualities([2, 61], cache=cache)
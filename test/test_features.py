@@ -0,0 +1,53 @@
+import numpy as np
+import openmlaslib.utils.features
+import unittest
+
+
+class TestFeatures(unittest.TestCase):
+
+    def setUp(self):
+        self.task_qualities = {1: {'NumberOfInstances': 150.0, 'ClassEntropy': 1.5, 'DecisionStumpAUC': 0.75},
+                               2: {'NumberOfInstances': 300.0, 'ClassEntropy': None},
+                               3: {'NumberOfInstances': 50.0, 'ClassEntropy': 0.5, 'DecisionStumpAUC': 0.5},
+                               4: {}}
+
+    def test_quality_family(self):
+        families = {name: openmlaslib.utils.features.quality_family(name)
+                    for name in ['NumberOfInstances', 'MajorityClassPercentage', 'MinorityClassPercentage',
+                                 'MinorityClassSize', 'MinNominalAttDistinctValues', 'MeanKurtosisOfNumericAtts',
+                                 'MeanAttributeEntropy', 'EquivalentNumberOfAtts', 'kNN1NErrRate',
+                                 'CfsSubsetEval_NaiveBayesAUC', 'MaxNominalAttDistinctValues', 'Unknown']}
+        self.assertEqual(families, {'NumberOfInstances': 'simple',
+                                    'MajorityClassPercentage': 'simple',
+                                    'MinorityClassPercentage': 'simple',
+                                    'MinorityClassSize': 'simple',
+                                    'MinNominalAttDistinctValues': 'statistical',
+                                    'MeanKurtosisOfNumericAtts': 'statistical',
+                                    'MeanAttributeEntropy': 'information_theoretic',
+                                    'EquivalentNumberOfAtts': 'information_theoretic',
+                                    'kNN1NErrRate': 'landmarking',
+                                    'CfsSubsetEval_NaiveBayesAUC': 'landmarking',
+                                    'MaxNominalAttDistinctValues': 'statistical',
+                                    'Unknown': 'other'})
+
+    def test_complete_features(self):
+        features = openmlaslib.utils.features.build_feature_matrix([1, 2, 3, 4], self.task_qualities)
+        # the task without qualities does not count towards the coverage
+        self.assertEqual(features.feature_names, ['NumberOfInstances'])
+        self.assertEqual(list(features.steps.items()), [('simple', ['NumberOfInstances'])])
+        self.assertEqual(list(openmlaslib.utils.features.feature_runstatus_rows(features)),
+                         [[1, '1', 'ok'], [2, '1', 'ok'], [3, '1', 'ok'], [4, '1', 'other']])
+
+    def test_coverage(self):
+        features = openmlaslib.utils.features.build_feature_matrix([1, 2, 3, 4], self.task_qualities,
+                                                                  min_coverage=0.5)
+        self.assertEqual(features.feature_names, ['ClassEntropy', 'DecisionStumpAUC', 'NumberOfInstances'])
+        self.assertEqual(list(features.steps.keys()), ['landmarking', 'information_theoretic', 'simple'])
+        self.assertTrue(np.isnan(features.values[1, 0]))
+        self.assertEqual(list(openmlaslib.utils.features.feature_rows(features)),
+                         [[1, '1', 1.5, 0.75, 150.0],
+                          [2, '1', None, None, 300.0],
+                          [3, '1', 0.5, 0.5, 50.0],
+                          [4, '1', None, None, None]])
+        self.assertEqual(list(openmlaslib.utils.features.feature_runstatus_rows(features))[1],
+                         [2, '1', 'other', 'other', 'ok'])
@@ -0,0 +1,24 @@
+import openmlaslib.utils.fetch
+import unittest
+
+
+class TestFetchFunctions(unittest.TestCase):
+
+    def test_fetch_qualities(self):
+        # data id 61 is iris, data id 2 is anneal. Duplicates should only be fetched once
+        data_ids = [61, 2, 61]
+        qualities = openmlaslib.utils.fetch.fetch_qualities(data_ids, n_jobs=2)
+        self.assertEqual(set(qualities.keys()), {2, 61})
+        self.assertEqual(qualities[61]['NumberOfInstances'], 150)
+        self.assertEqual(qualities[2]['NumberOfInstances'], 898)
+
+    def test_fetch_evaluations_chunked(self):
+        setups = [2361, 2362]
+        tasks = [1701, 1702]
+        evaluations = openmlaslib.utils.fetch.fetch_evaluations('predictive_accuracy', setups, tasks)
+        # every chunk contains a single setup and task, and every page a single evaluation
+        chunked = openmlaslib.utils.fetch.fetch_evaluations('predictive_accuracy', setups, tasks,
+                                                            n_jobs=4, chunk_size=1, page_size=1)
+        self.assertEqual(set(evaluations.keys()), set(chunked.keys()))
+        for run_id, evaluation in evaluations.items():
+            self.assertEqual(evaluation.value, chunked[run_id].value)
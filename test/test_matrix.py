@@ -0,0 +1,33 @@
+import numpy as np
+import openmlaslib.utils.matrix
+import unittest
+
+
+class TestPerformanceMatrix(unittest.TestCase):
+
+    def setUp(self):
+        self.matrix = openmlaslib.utils.matrix.PerformanceMatrix([3, 59, 3], ['Setup_1', 'Setup_2'])
+        self.matrix.set(3, 'Setup_1', 0.75)
+        self.matrix.set(3, 'Setup_2', 0.5)
+        self.matrix.set(59, 'Setup_2', 0.25)
+
+    def test_bookkeeping(self):
+        self.assertEqual(self.matrix.shape, (2, 2))
+        self.assertEqual(self.matrix.get(3, 'Setup_1'), 0.75)
+        self.assertIsNone(self.matrix.get(59, 'Setup_1'))
+        self.assertEqual(self.matrix.missing_cells(), [(59, 'Setup_1')])
+        self.assertEqual(self.matrix.observed_task_ids(), [3, 59])
+        self.assertEqual(self.matrix.observed_algorithms(), ['Setup_1', 'Setup_2'])
+
+    def test_subset(self):
+        subset = self.matrix.subset(task_ids=[59], algorithms=['Setup_2'])
+        self.assertEqual(subset.shape, (1, 1))
+        self.assertEqual(subset.get(59, 'Setup_2'), 0.25)
+        self.assertTrue(np.all(subset.observed))
+
+    def test_run_rows(self):
+        rows = list(self.matrix.run_rows(fill_value=0))
+        self.assertEqual(rows, [[3, '1', 'Setup_1', 0.75, 'ok'],
+                                [3, '1', 'Setup_2', 0.5, 'ok'],
+                                [59, '1', 'Setup_1', 0, 'other'],
+                                [59, '1', 'Setup_2', 0.25, 'ok']])
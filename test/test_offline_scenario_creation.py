@@ -0,0 +1,404 @@
+import arff
+import json
+import numpy as np
+import openml
+import openmlaslib
+import openmlaslib.testing
+import os
+import shutil
+import unittest
+import unittest.mock as mock
+import yaml
+
+
+class TestOfflineScenarioCreation(unittest.TestCase):
+
+    def setUp(self):
+        self.default_dir = os.path.expanduser('~').replace('\\', '/') + '/openml-aslib-tests/'
+
+    def tearDown(self):
+        if os.path.isdir(self.default_dir):
+            shutil.rmtree(self.default_dir)
+
+    @staticmethod
+    def _setup_list_to_dict(setup_list):
+        return {id: 'Setup_%d' % id for id in setup_list}
+
+    def _generate(self, fake, scenario_name, tasks=None, setups=None, measure='predictive_accuracy', **kwargs):
+        tasks = fake.task_ids if tasks is None else tasks
+        setups = fake.setup_ids if setups is None else setups
+        with fake.patch():
+            openmlaslib.utils.generate_scenario(setupid_setupname=self._setup_list_to_dict(setups),
+                                                tasks=tasks,
+                                                measure=measure,
+                                                output_dir=self.default_dir,
+                                                scenario_name=scenario_name,
+                                                **kwargs)
+        return os.path.join(self.default_dir, scenario_name)
+
+    def _test_generated_scenarios(self, directory, task_ids, setup_ids):
+        with open(os.path.join(directory, 'description.txt'), 'r') as fp:
+            description = yaml.safe_load(fp)
+        self.assertEqual(set(description['algorithms_deterministic'].keys()),
+                         set(self._setup_list_to_dict(setup_ids).values()))
+
+        with open(os.path.join(directory, 'algorithm_runs.arff'), 'r') as fp:
+            run_arff = arff.load(fp)
+        self.assertEqual(len(run_arff['data']), len(task_ids) * len(setup_ids))
+
+        with open(os.path.join(directory, 'feature_runstatus.arff'), 'r') as fp:
+            self.assertEqual(len(arff.load(fp)['data']), len(task_ids))
+
+        with open(os.path.join(directory, 'feature_values.arff'), 'r') as fp:
+            self.assertEqual(len(arff.load(fp)['data']), len(task_ids))
+        return run_arff
+
+    def test_create_scenario(self):
+        fake = openmlaslib.testing.FakeOpenML(num_tasks=5, num_setups=4, num_datasets=3)
+        directory = self._generate(fake, 'test_create_scenario', require_complete=True)
+        run_arff = self._test_generated_scenarios(directory, fake.task_ids, fake.setup_ids)
+        self.assertEqual({row[4] for row in run_arff['data']}, {'ok'})
+        # qualities are fetched once per dataset, without downloading the datasets
+        self.assertEqual(fake.calls['perform_api_call'], 3)
+        self.assertEqual(fake.calls['get_dataset'], 0)
+
+    def test_create_incomplete_scenario(self):
+        fake = openmlaslib.testing.FakeOpenML(num_tasks=10, num_setups=10, density=0.8)
+        directory = self._generate(fake, 'test_create_incomplete_scenario', require_complete=False)
+        run_arff = self._test_generated_scenarios(directory, fake.task_ids, fake.setup_ids)
+        num_other = len([row for row in run_arff['data'] if row[4] == 'other'])
+        self.assertEqual(num_other, (~fake.observed).sum())
+
+    def test_create_incomplete_scenario_raise(self):
+        fake = openmlaslib.testing.FakeOpenML(num_tasks=10, num_setups=10, density=0.8)
+        with self.assertRaises(Warning):
+            self._generate(fake, 'test_create_incomplete_scenario_raise', require_complete=True)
+
+    def test_create_incomplete_scenario_prune(self):
+        fake = openmlaslib.testing.FakeOpenML(num_tasks=10, num_setups=8, density=0.8)
+        directory = self._generate(fake, 'test_create_incomplete_scenario_prune', tasks=fake.task_ids + [11],
+                                   require_complete=True, prune_incomplete=True)
+        with open(os.path.join(directory, 'pruning.json'), 'r') as fp:
+            pruning = json.load(fp)
+        self.assertIn(11, pruning['dropped_tasks'])
+        self.assertEqual(pruning['coverage_after'], 1.0)
+        task_ids = [task_id for task_id in fake.task_ids if task_id not in pruning['dropped_tasks']]
+        setup_ids = [setup_id for setup_id in fake.setup_ids
+                     if 'Setup_%d' % setup_id not in pruning['dropped_algorithms']]
+        run_arff = self._test_generated_scenarios(directory, task_ids, setup_ids)
+        self.assertEqual({row[4] for row in run_arff['data']}, {'ok'})
+
+    def test_create_scenario_feature_coverage(self):
+        fake = openmlaslib.testing.FakeOpenML(num_tasks=10, num_setups=2, quality_density=0.8)
+        directory = self._generate(fake, 'test_create_scenario_feature_coverage', feature_coverage=0.5)
+        with open(os.path.join(directory, 'feature_values.arff'), 'r') as fp:
+            feature_arff = arff.load(fp)
+        coverage = fake.quality_observed.mean(axis=0)
+        self.assertEqual(len(feature_arff['attributes']) - 2, (coverage >= 0.5).sum())
+        self.assertIn(None, [value for row in feature_arff['data'] for value in row])
+        with open(os.path.join(directory, 'description.txt'), 'r') as fp:
+            description = yaml.safe_load(fp)
+        self.assertEqual(description['number_of_feature_steps'], len(description['feature_steps']))
+        self.assertEqual(sorted(feature for step in description['feature_steps'].values()
+                                for feature in step['provides']), description['features_deterministic'])
+
+    def test_create_scenario_per_fold(self):
+        fake = openmlaslib.testing.FakeOpenML(num_tasks=4, num_setups=3, density=0.8, num_repeats=2, num_folds=5)
+        directory = self._generate(fake, 'test_create_scenario_per_fold', per_fold=True)
+        with open(os.path.join(directory, 'algorithm_runs.arff'), 'r') as fp:
+            run_arff = arff.load(fp)
+        # missing cells have a single row
+        self.assertEqual(len(run_arff['data']), fake.observed.sum() * 2 + (~fake.observed).sum())
+        self.assertEqual({row[1] for row in run_arff['data']}, {1, 2})
+        self.assertEqual(len([row for row in run_arff['data'] if row[4] == 'ok']), fake.observed.sum() * 2)
+
+        with open(os.path.join(directory, 'performance_statistics.arff'), 'r') as fp:
+            statistics_arff = arff.load(fp)
+        self.assertEqual(len(statistics_arff['data']), fake.observed.sum())
+        for task_id, setup_name, mean, std, count in statistics_arff['data']:
+            row, column = fake.task_ids.index(int(task_id)), fake.setup_ids.index(int(setup_name.split('_')[1]))
+            self.assertAlmostEqual(mean, fake.values[row, column])
+            self.assertAlmostEqual(std, fake.fold_values(row, column).std(ddof=1))
+            self.assertEqual(count, 10)
+        with self.assertRaises(ValueError):
+            self._generate(fake, 'test_create_scenario_per_fold', per_fold=True, incremental=True)
+
+    def test_create_scenario_per_fold_shared_name(self):
+        fake = openmlaslib.testing.FakeOpenML(num_tasks=4, num_setups=3, num_repeats=3, num_folds=5, setups_per_flow=2)
+        with fake.patch():
+            openmlaslib.utils.generate_scenario(setupid_setupname={1: 'A', 2: 'A', 3: 'B'}, tasks=fake.task_ids,
+                                                measure='predictive_accuracy', output_dir=self.default_dir,
+                                                scenario_name='test_create_scenario_per_fold_shared_name',
+                                                require_complete=True, per_fold=True)
+        with open(os.path.join(self.default_dir, 'test_create_scenario_per_fold_shared_name',
+                               'algorithm_runs.arff'), 'r') as fp:
+            run_arff = arff.load(fp)
+        # A has the repetitions of two runs per task, B of one, without rows for repetitions that do not exist
+        self.assertEqual({row[4] for row in run_arff['data']}, {'ok'})
+        self.assertEqual(len([row for row in run_arff['data'] if row[2] == 'A']), 4 * 6)
+        self.assertEqual(len([row for row in run_arff['data'] if row[2] == 'B']), 4 * 3)
+
+    def test_create_scenario_baselines(self):
+        fake = openmlaslib.testing.FakeOpenML(num_tasks=6, num_setups=4, density=0.8)
+        directory = self._generate(fake, 'test_create_scenario_baselines', measure='root_mean_squared_error')
+        with open(os.path.join(directory, 'description.txt'), 'r') as fp:
+            self.assertEqual(yaml.safe_load(fp)['maximize'], [False])
+        with open(os.path.join(directory, 'algorithm_runs.arff'), 'r') as fp:
+            # runs without results have a missing value
+            self.assertEqual({row[3] is None for row in arff.load(fp)['data'] if row[4] == 'other'}, {True})
+        with open(os.path.join(directory, 'baselines.json'), 'r') as fp:
+            baselines = json.load(fp)
+        observed = np.where(fake.observed, fake.values, np.inf)
+        self.assertAlmostEqual(baselines['virtual_best']['mean_performance'], observed.min(axis=1).mean())
+
+        loaded = openmlaslib.utils.load_baselines(directory)
+        oracle = {task_id: algorithm for task_id, algorithm in
+                  zip(fake.task_ids, [self._setup_list_to_dict(fake.setup_ids)[fake.setup_ids[idx]]
+                                      for idx in observed.argmin(axis=1)])}
+        self.assertEqual(loaded.score_selection(oracle)['mean_regret'], 0.0)
+
+    def test_create_scenario_non_existing_setup(self):
+        fake = openmlaslib.testing.FakeOpenML(num_tasks=2, num_setups=2)
+        with self.assertRaises(Warning):
+            self._generate(fake, 'test_create_scenario_non_existing_setup', setups=[1, 2, 3])
+
+    def test_create_scenario_non_existing_task(self):
+        fake = openmlaslib.testing.FakeOpenML(num_tasks=2, num_setups=2)
+        with self.assertRaises(Warning):
+            self._generate(fake, 'test_create_scenario_non_existing_task', tasks=[1, 2, 3])
+
+    def test_create_scenario_incremental(self):
+        fake = openmlaslib.testing.FakeOpenML(num_tasks=10, num_setups=6, density=0.9)
+        self._generate(fake, 'test_create_scenario_incremental', setups=[1, 2, 3, 4], incremental=True)
+        fake.calls.clear()
+        directory = self._generate(fake, 'test_create_scenario_incremental', incremental=True)
+        self._test_generated_scenarios(directory, fake.task_ids, fake.setup_ids)
+        # qualities were all obtained before, only the new setups have to be resolved
+        self.assertEqual(fake.calls['perform_api_call'], 0)
+        self.assertEqual(fake.calls['get_flow'], 2)
+
+        full_directory = self._generate(fake, 'test_create_scenario_full')
+        for filename in ['algorithm_runs.arff', 'feature_values.arff', 'description.txt']:
+            with open(os.path.join(directory, filename)) as fp_incremental, \
+                    open(os.path.join(full_directory, filename)) as fp_full:
+                self.assertEqual(fp_incremental.read(), fp_full.read().replace('test_create_scenario_full',
+                                                                               'test_create_scenario_incremental'))
+
+    def test_create_scenario_incremental_features(self):
+        # the features that are selected depend on the qualities of all tasks
+        fake = openmlaslib.testing.FakeOpenML(num_tasks=10, num_setups=4, quality_density=0.7)
+        self._generate(fake, 'test_create_scenario_incremental_features', tasks=fake.task_ids[:4], incremental=True,
+                       feature_coverage=0.5)
+        fake.calls.clear()
+        directory = self._generate(fake, 'test_create_scenario_incremental_features', incremental=True,
+                                   feature_coverage=0.5)
+        # the qualities of the first tasks are reused
+        self.assertEqual(fake.calls['perform_api_call'], 6)
+
+        full_directory = self._generate(fake, 'test_create_scenario_features_full', feature_coverage=0.5)
+        for filename in ['algorithm_runs.arff', 'feature_values.arff', 'feature_runstatus.arff', 'description.txt']:
+            with open(os.path.join(directory, filename)) as fp_incremental, \
+                    open(os.path.join(full_directory, filename)) as fp_full:
+                self.assertEqual(fp_incremental.read(),
+                                 fp_full.read().replace('test_create_scenario_features_full',
+                                                        'test_create_scenario_incremental_features'))
+
+    def test_create_scenario_incremental_prune(self):
+        fake = openmlaslib.testing.FakeOpenML(num_tasks=30, num_setups=20, density=0.6)
+        directory = self._generate(fake, 'test_create_scenario_incremental_prune', incremental=True,
+                                   prune_incomplete=True, min_coverage=0.9)
+        with open(os.path.join(directory, 'algorithm_runs.arff')) as fp:
+            runs = fp.read()
+        # the pruned cells were obtained before, only the cells without result are requested again
+        with mock.patch.object(openmlaslib.utils.scenario, 'fetch_evaluation_cells',
+                               wraps=openmlaslib.utils.scenario.fetch_evaluation_cells) as fetch_evaluation_cells:
+            self._generate(fake, 'test_create_scenario_incremental_prune', incremental=True, prune_incomplete=True,
+                           min_coverage=0.9)
+        self.assertEqual(len(fetch_evaluation_cells.call_args[0][1]), int((~fake.observed).sum()))
+        with open(os.path.join(directory, 'algorithm_runs.arff')) as fp:
+            self.assertEqual(fp.read(), runs)
+
+    def test_create_scenario_incremental_cache(self):
+        fake = openmlaslib.testing.FakeOpenML(num_tasks=10, num_setups=6, density=0.8)
+        cache = openmlaslib.utils.MetadataCache(os.path.join(self.default_dir, 'cache', 'metadata.sqlite'))
+        self._generate(fake, 'test_create_scenario_incremental_cache', incremental=True, cache=cache)
+        # runs were uploaded on the cells that had no result, these are not served from the cache
+        fake.observed[:] = True
+        directory = self._generate(fake, 'test_create_scenario_incremental_cache', incremental=True, cache=cache,
+                                   require_complete=True)
+        cache.close()
+        self._test_generated_scenarios(directory, fake.task_ids, fake.setup_ids)
+
+    def test_fetch_qualities_request_method(self):
+        fake = openmlaslib.testing.FakeOpenML(num_tasks=2, num_setups=1)
+        request_methods = []
+
+        # the signature of recent versions of the openml package
+        def perform_api_call(call, request_method, data=None, file_elements=None):
+            request_methods.append(request_method)
+            return fake.perform_api_call(call)
+
+        with fake.patch(), mock.patch.object(openml._api_calls, '_perform_api_call', perform_api_call):
+            qualities = openmlaslib.utils.fetch.fetch_qualities([1, 2], n_jobs=1)
+        self.assertEqual(qualities, {1: fake.qualities(1), 2: fake.qualities(2)})
+        self.assertEqual(request_methods, ['get', 'get'])
+
+    def test_fetch_evaluations_retry(self):
+        fake = openmlaslib.testing.FakeOpenML(num_tasks=3, num_setups=2)
+        errors = []
+
+        def failing_list_evaluations(*args, **kwargs):
+            fake.calls['attempts'] += 1
+            if len(errors) > 0:
+                raise errors.pop()
+            return fake.list_evaluations(*args, **kwargs)
+
+        with fake.patch(), mock.patch.object(openml.evaluations, 'list_evaluations', failing_list_evaluations):
+            # transient: a connection error and the database connection error of OpenML are retried
+            errors.extend([IOError('Connection reset'),
+                           openml.exceptions.OpenMLServerException('Database connection error', code=107)])
+            evaluations = openmlaslib.utils.fetch.fetch_evaluations('predictive_accuracy', fake.setup_ids,
+                                                                    fake.task_ids, backoff=0)
+            self.assertEqual(len(evaluations), 6)
+            self.assertEqual(fake.calls['attempts'], 3)
+            # permanent: an error response of OpenML is raised at once
+            fake.calls.clear()
+            errors.append(openml.exceptions.OpenMLServerException('Unknown evaluation measure', code=543))
+            with self.assertRaises(openml.exceptions.OpenMLServerException):
+                openmlaslib.utils.fetch.fetch_evaluations('predictive_accuracy', fake.setup_ids, fake.task_ids,
+                                                          backoff=0)
+            self.assertEqual(fake.calls['attempts'], 1)
+
+    def test_fetch_evaluations_failed_chunk_cache(self):
+        fake = openmlaslib.testing.FakeOpenML(num_tasks=4, num_setups=3)
+        cache = openmlaslib.utils.MetadataCache(os.path.join(self.default_dir, 'cache', 'metadata.sqlite'))
+
+        def failing_list_evaluations(*args, **kwargs):
+            if fake.task_ids[-1] in kwargs['tasks']:
+                raise openml.exceptions.OpenMLServerException('Unknown evaluation measure', code=543)
+            return fake.list_evaluations(*args, **kwargs)
+
+        with fake.patch():
+            with mock.patch.object(openml.evaluations, 'list_evaluations', failing_list_evaluations):
+                with self.assertRaises(openml.exceptions.OpenMLServerException):
+                    openmlaslib.utils.fetch.fetch_evaluations('predictive_accuracy', fake.setup_ids, fake.task_ids,
+                                                              chunk_size=1, n_jobs=2, cache=cache)
+            # the chunks that finished were stored, only the chunks of the failing task are requested again
+            fake.calls.clear()
+            evaluations = openmlaslib.utils.fetch.fetch_evaluations('predictive_accuracy', fake.setup_ids,
+                                                                    fake.task_ids, chunk_size=1, cache=cache)
+        cache.close()
+        self.assertEqual(len(evaluations), 12)
+        self.assertEqual(fake.calls['list_evaluations'], 3)
+
+    def test_fake_signature(self):
+        fake = openmlaslib.testing.FakeOpenML(num_tasks=2, num_setups=2)
+        with fake.patch():
+            # the fake only accepts what the installed openml package accepts
+            with self.assertRaises(TypeError):
+                openml.evaluations.list_evaluations(function='predictive_accuracy', unknown_filter=fake.task_ids)
+            evaluations = openml.evaluations.list_evaluations('predictive_accuracy', size=1)
+        self.assertEqual(len(evaluations), 1)
+
+    def test_fetch_evaluation_cells(self):
+        fake = openmlaslib.testing.FakeOpenML(num_tasks=30, num_setups=10, density=0.8)
+        # every setup misses a different set of tasks, so each forms its own group
+        cells = [(task_id, setup_id) for setup_id in fake.setup_ids for task_id in fake.task_ids
+                 if task_id % (setup_id + 1) != 0]
+        with fake.patch():
+            evaluations = openmlaslib.utils.fetch.fetch_evaluation_cells('predictive_accuracy', cells, n_jobs=4)
+        self.assertEqual(fake.calls['list_evaluations'], 10)
+        expected = {(task_id, setup_id) for task_id, setup_id in cells
+                    if fake.observed[fake.task_ids.index(task_id), fake.setup_ids.index(setup_id)]}
+        self.assertEqual({(evaluation.task_id, evaluation.setup_id) for evaluation in evaluations.values()}, expected)
+
+    def test_create_scenario_incremental_binary(self):
+        fake = openmlaslib.testing.FakeOpenML(num_tasks=5, num_setups=4)
+        self._generate(fake, 'test_create_scenario_incremental_binary', setups=[1, 2], incremental=True, binary=True)
+        directory = self._generate(fake, 'test_create_scenario_incremental_binary', incremental=True)
+        # the binary copy of the first generation is outdated, and is removed
+        self.assertFalse(os.path.isdir(os.path.join(directory, 'binary')))
+        baselines = openmlaslib.utils.load_baselines(directory)
+        self.assertEqual(baselines.performance.algorithms, ['Setup_1', 'Setup_2', 'Setup_3', 'Setup_4'])
+        self.assertEqual(baselines.score_selection({1: 'Setup_3'})['num_solved'], 1)
+
+    def test_create_scenario_batched_setups(self):
+        fake = openmlaslib.testing.FakeOpenML(num_tasks=3, num_setups=12, setups_per_flow=4)
+        directory = self._generate(fake, 'test_create_scenario_batched_setups')
+        self.assertEqual(fake.calls['list_setups'], 1)
+        self.assertEqual(fake.calls['get_flow'], 3)
+        with open(os.path.join(directory, 'description.txt'), 'r') as fp:
+            description = yaml.safe_load(fp)
+        self.assertEqual(description['algorithms_deterministic']['Setup_5']['configuration'], 'Flow_2(1)_C=5.0')
+
+    def test_create_scenario_setups_different_flow(self):
+        fake = openmlaslib.testing.FakeOpenML(num_tasks=3, num_setups=4, setups_per_flow=2)
+        with self.assertRaises(ValueError):
+            with fake.patch():
+                # setup 2 and 3 are generated by a different flow
+                openmlaslib.utils.generate_scenario(setupid_setupname={1: 'A', 2: 'B', 3: 'B', 4: 'C'},
+                                                    tasks=fake.task_ids,
+                                                    measure='predictive_accuracy',
+                                                    output_dir=self.default_dir,
+                                                    scenario_name='test_create_scenario_setups_different_flow')
+
+    def test_create_scenario_binary(self):
+        fake = openmlaslib.testing.FakeOpenML(num_tasks=4, num_setups=3, density=0.8)
+        directory = self._generate(fake, 'test_create_scenario_binary', binary=True)
+        arrays = openmlaslib.utils.load_scenario_arrays(directory)
+        self.assertEqual(list(arrays.task_ids), fake.task_ids)
+        self.assertEqual(arrays.performance.shape, (4, 3))
+        self.assertEqual((arrays.runstatus == 0).sum(), fake.observed.sum())
+        # the same feature steps and run status as the ARFF files
+        with open(os.path.join(directory, 'description.txt'), 'r') as fp:
+            description = yaml.safe_load(fp)
+        self.assertEqual(list(arrays.feature_steps), description['default_steps'])
+        self.assertEqual({step: provides for step, provides in arrays.feature_steps.items()},
+                         {step: properties['provides'] for step, properties in description['feature_steps'].items()})
+        with open(os.path.join(directory, 'feature_runstatus.arff'), 'r') as fp:
+            runstatus_arff = arff.load(fp)
+        self.assertEqual([[openmlaslib.utils.sidecar.RUNSTATUS[code] for code in row]
+                          for row in arrays.feature_runstatus.tolist()],
+                         [row[2:] for row in runstatus_arff['data']])
+
+    def test_create_scenario_profile(self):
+        fake = openmlaslib.testing.FakeOpenML(num_tasks=4, num_setups=3, num_datasets=2)
+        reported = []
+        profiler = openmlaslib.utils.Profiler(callback=lambda phase, metrics: reported.append(phase))
+        directory = self._generate(fake, 'test_create_scenario_profile', profiler=profiler)
+        with open(os.path.join(directory, 'profile.json'), 'r') as fp:
+            profile = json.load(fp)
+        self.assertEqual(list(profile['phases'].keys()), ['evaluations', 'qualities', 'setups', 'serialization'])
+        self.assertEqual(reported, ['evaluations', 'qualities', 'setups', 'serialization'])
+        self.assertEqual(profile['phases']['evaluations']['api_calls'], fake.calls['list_evaluations'])
+        self.assertEqual(profile['phases']['qualities']['api_calls'], 2)
+        self.assertGreater(profile['phases']['qualities']['bytes_received'], 0)
+        # the size of the responses of the openml package is unknown
+        self.assertIsNone(profile['phases']['evaluations']['bytes_received'])
+        self.assertEqual(profile['total']['bytes_received'], profile['phases']['qualities']['bytes_received'])
+        self.assertGreater(profile['phases']['serialization']['peak_memory_mb'], 0)
+        self.assertEqual(profile['total']['api_calls'], sum(fake.calls.values()))
+
+    def test_create_scenarios_batch(self):
+        fake = openmlaslib.testing.FakeOpenML(num_tasks=6, num_setups=5, density=0.9, num_datasets=4)
+        specs = [openmlaslib.utils.ScenarioSpec('predictive_accuracy', fake.task_ids,
+                                                self._setup_list_to_dict(fake.setup_ids), 'accuracy'),
+                 openmlaslib.utils.ScenarioSpec('area_under_roc_curve', fake.task_ids,
+                                                self._setup_list_to_dict(fake.setup_ids), 'auc'),
+                 openmlaslib.utils.ScenarioSpec('predictive_accuracy', fake.task_ids[:3],
+                                                self._setup_list_to_dict(fake.setup_ids[:2]), 'subset')]
+        with fake.patch():
+            openmlaslib.utils.generate_scenarios(specs, self.default_dir)
+        # shared data is obtained once
+        self.assertEqual(fake.calls['perform_api_call'], 4)
+        self.assertEqual(fake.calls['list_setups'], 1)
+        self.assertEqual(fake.calls['get_flow'], 5)
+
+        # identical to generating the scenarios one by one
+        for spec in specs:
+            directory = self._generate(fake, spec.name + '_single', tasks=spec.tasks,
+                                       setups=spec.setupid_setupname.keys(), measure=spec.measure)
+            for filename in ['algorithm_runs.arff', 'feature_values.arff', 'description.txt']:
+                with open(os.path.join(self.default_dir, spec.name, filename)) as fp_batch, \
+                        open(os.path.join(directory, filename)) as fp_single:
+                    self.assertEqual(fp_batch.read(), fp_single.read().replace(spec.name + '_single', spec.name))
@@ -0,0 +1,59 @@
+import itertools
+import numpy as np
+import openmlaslib.utils.matrix
+import openmlaslib.utils.pruning
+import unittest
+
+
+class TestPruning(unittest.TestCase):
+
+    @staticmethod
+    def _matrix(observed):
+        matrix = openmlaslib.utils.matrix.PerformanceMatrix(range(1, observed.shape[0] + 1),
+                                                            ['Setup_%d' % idx for idx in range(observed.shape[1])])
+        matrix.observed = np.asarray(observed, dtype=bool)
+        return matrix
+
+    def test_exact(self):
+        rng = np.random.RandomState(0)
+        for _ in range(50):
+            observed = rng.rand(rng.randint(1, 7), rng.randint(1, 6)) < 0.7
+            if not observed.any():
+                continue
+            # the largest complete subgrid, by brute force
+            best = max(len(rows) * len(columns)
+                       for num_rows in range(1, observed.shape[0] + 1)
+                       for rows in itertools.combinations(range(observed.shape[0]), num_rows)
+                       for num_columns in range(1, observed.shape[1] + 1)
+                       for columns in itertools.combinations(range(observed.shape[1]), num_columns)
+                       if observed[np.ix_(rows, columns)].all())
+            selection = openmlaslib.utils.pruning.select_complete_subgrid(self._matrix(observed))
+            self.assertEqual(selection.method, 'exact')
+            self.assertEqual(selection.coverage, 1.0)
+            self.assertEqual(len(selection.task_ids) * len(selection.algorithms), best)
+
+    def test_greedy(self):
+        rng = np.random.RandomState(0)
+        observed = rng.rand(300, 200) < 0.8
+        observed[:250, :150] = True
+        selection = openmlaslib.utils.pruning.select_complete_subgrid(self._matrix(observed), exact_limit=10)
+        self.assertEqual(selection.method, 'greedy')
+        self.assertEqual(selection.coverage, 1.0)
+        self.assertEqual(selection.task_ids, list(range(1, 251)))
+        self.assertEqual(len(selection.algorithms), 150)
+        self.assertEqual(len(selection.dropped_task_ids) + len(selection.task_ids), 300)
+
+    def test_min_coverage(self):
+        observed = np.array([[1, 1, 1, 1],
+                             [1, 1, 1, 0],
+                             [0, 0, 0, 0]])
+        complete = openmlaslib.utils.pruning.select_complete_subgrid(self._matrix(observed))
+        self.assertEqual((complete.task_ids, complete.dropped_algorithms), ([1, 2], ['Setup_3']))
+        partial = openmlaslib.utils.pruning.select_complete_subgrid(self._matrix(observed), min_coverage=0.8)
+        # the empty task is always dropped
+        self.assertEqual((partial.task_ids, partial.dropped_algorithms), ([1, 2], []))
+        self.assertEqual(partial.coverage, 7 / 8)
+        with self.assertRaises(ValueError):
+            openmlaslib.utils.pruning.select_complete_subgrid(self._matrix(observed), min_coverage=0)
+        with self.assertRaises(ValueError):
+            openmlaslib.utils.pruning.select_complete_subgrid(self._matrix(np.zeros((2, 2))))
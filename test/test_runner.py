@@ -0,0 +1,63 @@
+import concurrent.futures
+import json
+import openmlaslib.utils.runner
+import os
+import shutil
+import unittest
+import unittest.mock as mock
+
+
+class TestRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.default_dir = os.path.expanduser('~').replace('\\', '/') + '/openml-aslib-tests/'
+        self.checkpoint_file = os.path.join(self.default_dir, 'runs.jsonl')
+        self.ran = []
+
+    def tearDown(self):
+        if os.path.isdir(self.default_dir):
+            shutil.rmtree(self.default_dir)
+
+    def _fake_run(self, model, task_id):
+        # model is the setup id it obtains on all tasks, except on the tasks in failing_tasks
+        self.ran.append((model, task_id))
+        if task_id in self.failing_tasks:
+            raise ValueError('Task %d is down' % task_id)
+        return 100 * model + task_id, model + task_id * self.setup_per_task
+
+    def _run(self, models, task_ids, failing_tasks=(), setup_per_task=0):
+        self.ran = []
+        self.failing_tasks = set(failing_tasks)
+        self.setup_per_task = setup_per_task
+        # threads instead of processes, so that the patched function is used
+        with mock.patch.object(openmlaslib.utils.runner, '_run_model_on_task', self._fake_run), \
+                mock.patch.object(concurrent.futures, 'ProcessPoolExecutor', concurrent.futures.ThreadPoolExecutor):
+            return openmlaslib.utils.runner.run_models_on_tasks(models, task_ids, self.checkpoint_file, n_jobs=2)
+
+    def test_resume(self):
+        models = {'A': 1, 'B': 2}
+        with self.assertRaises(ValueError):
+            self._run(models, [3, 4, 5], failing_tasks=[4])
+        self.assertEqual(len(self.ran), 6)
+        # only the failed combinations are ran again
+        self.assertEqual(self._run(models, [3, 4, 5]), {1: 'A', 2: 'B'})
+        self.assertEqual(sorted(self.ran), [(1, 4), (2, 4)])
+        self.assertEqual(self._run(models, [3, 4, 5]), {1: 'A', 2: 'B'})
+        self.assertEqual(self.ran, [])
+
+    def test_resume_partial_line(self):
+        models = {'A': 1}
+        self._run(models, [3, 4])
+        # a crash while writing left half a record
+        with open(self.checkpoint_file, 'a') as fp:
+            fp.write('{"name": "A", "task_')
+        self.assertEqual(self._run(models, [3, 4, 5]), {1: 'A'})
+        self.assertEqual(self.ran, [(1, 5)])
+        with open(self.checkpoint_file, 'r') as fp:
+            records = [json.loads(line) for line in fp]
+        self.assertEqual(sorted(record['task_id'] for record in records), [3, 4, 5])
+        self.assertEqual(self._run(models, [3, 4, 5]), {1: 'A'})
+
+    def test_setup_mismatch(self):
+        with self.assertRaises(ValueError):
+            self._run({'A': 1}, [3, 4], setup_per_task=1)
@@ -50,6 +50,19 @@ class TestMiscFunctions(unittest.TestCase):
                                             require_complete=True)
         self._test_generated_scenarios(os.path.join(self.default_dir, scenario_name), tasks, setups)
 
+    def test_create_scenario_incremental(self):
+        tasks = [1701, 1702]
+        scenario_name = 'test_create_scenario_incremental'
+        for setups in [[2361], [2361, 2362]]:
+            openmlaslib.utils.generate_scenario(setupid_setupname=TestMiscFunctions._setup_list_to_dict(setups),
+                                                tasks=tasks,
+                                                measure='predictive_accuracy',
+                                                output_dir=self.default_dir,
+                                                scenario_name=scenario_name,
+                                                require_complete=True,
+                                                incremental=True)
+            self._test_generated_scenarios(os.path.join(self.default_dir, scenario_name), tasks, setups)
+
     def test_create_imcomplete_scenario(self):
         # note that these setups can't be ran on both task (due to imputation parameter)
         setups = [6672945, 6777909]
@@ -0,0 +1,107 @@
+import filecmp
+import json
+import multiprocessing
+import openml
+import openmlaslib
+import openmlaslib.testing
+import os
+import shutil
+import unittest
+
+from unittest import mock
+
+
+class TestShardedScenarioCreation(unittest.TestCase):
+
+    def setUp(self):
+        self.default_dir = os.path.expanduser('~').replace('\\', '/') + '/openml-aslib-tests/'
+
+    def tearDown(self):
+        if os.path.isdir(self.default_dir):
+            shutil.rmtree(self.default_dir)
+
+    @staticmethod
+    def _setup_list_to_dict(setup_list):
+        return {id: 'Setup_%d' % id for id in setup_list}
+
+    def _compare(self, fake, n_jobs):
+        setupid_setupname = self._setup_list_to_dict(fake.setup_ids)
+        with fake.patch():
+            openmlaslib.utils.generate_scenario(setupid_setupname, fake.task_ids, 'predictive_accuracy',
+                                                os.path.join(self.default_dir, 'single'), 'scenario')
+            openmlaslib.utils.generate_scenario_sharded(setupid_setupname, fake.task_ids, 'predictive_accuracy',
+                                                        os.path.join(self.default_dir, 'sharded'), 'scenario',
+                                                        shard_size=3, n_jobs=n_jobs)
+        self.assertEqual(len(os.listdir(os.path.join(self.default_dir, 'sharded', 'scenario', 'shards'))), 4)
+        for filename in ['algorithm_runs.arff', 'feature_values.arff', 'feature_runstatus.arff', 'description.txt',
+                         'manifest.json']:
+            self.assertTrue(filecmp.cmp(os.path.join(self.default_dir, 'single', 'scenario', filename),
+                                        os.path.join(self.default_dir, 'sharded', 'scenario', filename),
+                                        shallow=False))
+        # the API calls of the workers are recorded as well
+        with open(os.path.join(self.default_dir, 'sharded', 'scenario', 'profile.json')) as fp:
+            self.assertEqual(json.load(fp)['phases']['shards']['api_calls'], 4)
+
+    def test_create_scenario_sharded(self):
+        fake = openmlaslib.testing.FakeOpenML(num_tasks=10, num_setups=5, density=0.8, num_datasets=7,
+                                              quality_density=0.9)
+        self._compare(fake, n_jobs=1)
+
+    @unittest.skipIf(multiprocessing.get_start_method() != 'fork', 'the patched OpenML is only inherited by fork')
+    def test_create_scenario_sharded_processes(self):
+        fake = openmlaslib.testing.FakeOpenML(num_tasks=10, num_setups=5, density=0.8, num_datasets=7)
+        self._compare(fake, n_jobs=2)
+
+    def test_create_scenario_sharded_qualities(self):
+        # tasks of different shards share datasets, the qualities of each dataset are obtained once
+        fake = openmlaslib.testing.FakeOpenML(num_tasks=10, num_setups=2, num_datasets=4)
+        profiler = openmlaslib.utils.Profiler(trace_memory=False)
+        with fake.patch():
+            openmlaslib.utils.generate_scenario_sharded(self._setup_list_to_dict(fake.setup_ids), fake.task_ids,
+                                                        'predictive_accuracy', self.default_dir,
+                                                        'test_create_scenario_sharded_qualities', shard_size=3,
+                                                        n_jobs=1, profiler=profiler)
+        self.assertEqual(fake.calls['perform_api_call'], 4)
+        self.assertEqual(profiler.phases['shards']['api_calls'], 4)
+        self.assertEqual(profiler.phases['qualities']['api_calls'], 4)
+
+    def test_create_scenario_sharded_retry(self):
+        fake = openmlaslib.testing.FakeOpenML(num_tasks=10, num_setups=3)
+        list_evaluations = fake.list_evaluations
+
+        def failing_list_evaluations(*args, **kwargs):
+            if 5 in kwargs['tasks']:
+                raise ValueError('Task 5 is unavailable')
+            return list_evaluations(*args, **kwargs)
+
+        kwargs = {'setupid_setupname': self._setup_list_to_dict(fake.setup_ids), 'tasks': fake.task_ids,
+                  'measure': 'predictive_accuracy', 'output_dir': self.default_dir,
+                  'scenario_name': 'test_create_scenario_sharded_retry', 'shard_size': 4, 'n_jobs': 1}
+        with fake.patch():
+            with mock.patch.object(openml.evaluations, 'list_evaluations', failing_list_evaluations):
+                with self.assertRaises(ValueError):
+                    openmlaslib.utils.generate_scenario_sharded(max_retries=1, **kwargs)
+            # the shard with task 5 failed twice, the other shards were listed once
+            self.assertEqual(fake.calls['list_evaluations'], 2)
+            fake.calls.clear()
+            openmlaslib.utils.generate_scenario_sharded(**kwargs)
+            # only the failed shard is processed again
+            self.assertEqual(fake.calls['list_evaluations'], 1)
+        self.assertTrue(os.path.isfile(os.path.join(self.default_dir, 'test_create_scenario_sharded_retry',
+                                                    'algorithm_runs.arff')))
+
+    def test_create_scenario_sharded_changed_mapping(self):
+        fake = openmlaslib.testing.FakeOpenML(num_tasks=6, num_setups=3)
+        work_dir = os.path.join(self.default_dir, 'work')
+        kwargs = {'tasks': fake.task_ids, 'measure': 'predictive_accuracy', 'output_dir': self.default_dir,
+                  'scenario_name': 'test_create_scenario_sharded_changed_mapping', 'shard_size': 3, 'n_jobs': 1,
+                  'work_dir': work_dir}
+        with fake.patch():
+            openmlaslib.utils.generate_scenario_sharded(setupid_setupname={1: 'A', 2: 'B'}, **kwargs)
+            fake.calls.clear()
+            # the same names, but B is now another setup: the partial results can not be reused
+            openmlaslib.utils.generate_scenario_sharded(setupid_setupname={1: 'A', 3: 'B'}, **kwargs)
+            self.assertEqual(fake.calls['list_evaluations'], 2)
+        scenario_dir = os.path.join(self.default_dir, 'test_create_scenario_sharded_changed_mapping')
+        with open(os.path.join(scenario_dir, 'manifest.json')) as fp:
+            self.assertEqual(json.load(fp)['algorithm_setups'], {'A': [1], 'B': [3]})
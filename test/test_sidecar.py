@@ -0,0 +1,41 @@
+import numpy as np
+import openmlaslib
+import openmlaslib.utils.matrix
+import openmlaslib.utils.sidecar
+import os
+import shutil
+import unittest
+
+
+class TestSidecar(unittest.TestCase):
+
+    def setUp(self):
+        self.default_dir = os.path.expanduser('~').replace('\\', '/') + '/openml-aslib-tests/'
+
+    def tearDown(self):
+        if os.path.isdir(self.default_dir):
+            shutil.rmtree(self.default_dir)
+
+    def test_write_load_scenario_arrays(self):
+        performance = openmlaslib.utils.matrix.PerformanceMatrix([3, 59], ['Setup_1', 'Setup_2'])
+        performance.set(3, 'Setup_1', 0.75)
+        performance.set(59, 'Setup_2', 0.25)
+        features = np.array([[150.0, np.nan], [898.0, 38.0]])
+        openmlaslib.utils.sidecar.write_scenario_arrays(self.default_dir, 'predictive_accuracy', performance,
+                                                        ['NumberOfInstances', 'NumberOfFeatures'], features,
+                                                        np.array([[0, 0], [0, 5]], dtype=np.int8),
+                                                        {'simple': ['NumberOfInstances'],
+                                                         'other': ['NumberOfFeatures']})
+
+        for mmap in [True, False]:
+            arrays = openmlaslib.utils.load_scenario_arrays(self.default_dir, mmap=mmap)
+            self.assertEqual(arrays.measure, 'predictive_accuracy')
+            self.assertEqual(arrays.algorithms, ['Setup_1', 'Setup_2'])
+            self.assertEqual(arrays.feature_names, ['NumberOfInstances', 'NumberOfFeatures'])
+            np.testing.assert_array_equal(arrays.task_ids, [3, 59])
+            np.testing.assert_array_equal(arrays.performance, [[0.75, 0], [0, 0.25]])
+            np.testing.assert_array_equal(arrays.runstatus, [[0, 5], [5, 0]])
+            np.testing.assert_array_equal(arrays.features, features)
+            self.assertEqual(list(arrays.feature_steps.items()), [('simple', ['NumberOfInstances']),
+                                                                  ('other', ['NumberOfFeatures'])])
+            np.testing.assert_array_equal(arrays.feature_runstatus, [[0, 0], [0, 5]])